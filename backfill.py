@@ -0,0 +1,148 @@
+"""
+Multi-region, multi-year backfill
+Fills the store for several regions over a date range in one run:
+
+    BACKFILL_REGIONS=IN-MH,IN-KA,IN-GJ BACKFILL_START=2020-01-01 python backfill.py
+
+Every missing (region, day) becomes one job. Jobs run newest day first, with
+regions interleaved, under the single EBIRD_RATE_LIMIT bucket shared by all
+regions. Each day is staged in the store as soon as it arrives and a month is
+merged into its partition the moment its last day is in, so a rerun after a
+crash or failed days only fetches what is still missing.
+"""
+
+import os
+from datetime import date
+
+import instrument
+from fetch_engine import fetch_jobs
+from incremental_fetch import (
+    days_to_fetch, finish_month, load_manifest, resumable_days, stage_records
+)
+
+
+# ---------------------------------------
+# CONFIG
+# ---------------------------------------
+
+EBIRD_API_KEY = os.getenv("EBIRD_API_KEY")
+
+# Free text from the workflow form, e.g. "IN-MH, IN-KA"
+REGIONS = [code.strip() for code in os.getenv("BACKFILL_REGIONS", "IN-MH").split(",") if code.strip()]
+START = os.getenv("BACKFILL_START", "2020-01-01")
+END = os.getenv("BACKFILL_END", "")
+
+
+# ---------------------------------------
+# PLANNING
+# ---------------------------------------
+
+def months_between(start, end):
+    """
+    Every (year, month) from start's month to end's month, inclusive.
+    """
+    months = []
+    year, month = start.year, start.month
+
+    while (year, month) <= (end.year, end.month):
+        months.append((year, month))
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+    return months
+
+
+def plan_jobs(regions, start, end, manifest):
+    """
+    Returns (jobs, pending, counts):
+      jobs     [(region, day), ...] to fetch, newest day first
+      pending  {(region, year, month): days still to fetch}
+      counts   {(region, year, month): {day: records}} already staged
+    """
+    jobs = []
+    pending = {}
+    counts = {}
+
+    for region in regions:
+        for year, month in months_between(start, end):
+            days = [
+                day for day in days_to_fetch(manifest, region, year, month)
+                if start <= day <= end
+            ]
+            if not days:
+                continue
+
+            key = (region, year, month)
+            counts[key] = resumable_days(region, year, month, days)
+
+            todo = [day for day in days if day not in counts[key]]
+            pending[key] = len(todo)
+            jobs.extend((region, day) for day in todo)
+
+    # Recent data is what the pages show, so it lands first
+    order = {region: i for i, region in enumerate(regions)}
+    jobs.sort(key=lambda job: (-job[1].toordinal(), order[job[0]]))
+
+    return jobs, pending, counts
+
+
+# ---------------------------------------
+# RUN
+# ---------------------------------------
+
+def backfill(regions, start, end, api_key=EBIRD_API_KEY, **fetch_kwargs):
+    """
+    Fetch every missing day for `regions` between `start` and `end`
+    (dates, inclusive). Returns the fetch stats; failed days are left
+    for the next run and their months aren't merged.
+    """
+    if not api_key:
+        raise ValueError("EBIRD_API_KEY not set")
+
+    end = min(end, date.today())
+    manifest = load_manifest()
+
+    jobs, pending, counts = plan_jobs(regions, start, end, manifest)
+
+    print(
+        f"Backfilling {', '.join(regions)} from {start} to {end}: "
+        f"{len(jobs)} days to fetch across {len(pending)} months"
+    )
+
+    # Months an earlier run fully staged but never merged
+    for (region, year, month), remaining in list(pending.items()):
+        if not remaining:
+            finish_month(manifest, region, year, month, counts.pop((region, year, month)))
+            del pending[region, year, month]
+
+    if not jobs:
+        return {"days": 0, "failed": 0, "failed_days": [], "requests": 0}
+
+    def on_day(region, day, records):
+        stage_records(region, day, records)
+
+        key = (region, day.year, day.month)
+        counts[key][day] = len(records)
+        pending[key] -= 1
+
+        # Merge as soon as the month is whole; blocks the other workers
+        # only for the few seconds a month takes to compact
+        if not pending[key]:
+            finish_month(manifest, region, day.year, day.month, counts.pop(key))
+
+    with instrument.stage("fetch", f"{start}..{end}"):
+        _, stats = fetch_jobs(jobs, api_key, on_day=on_day, **fetch_kwargs)
+
+    incomplete = sorted(key for key, remaining in pending.items() if remaining)
+    for region, year, month in incomplete:
+        print(f"⚠ {region} {year}-{month:02d}: {pending[region, year, month]} day(s) failed; rerun to resume")
+
+    return stats
+
+
+if __name__ == "__main__":
+    with instrument.run("backfill"):
+        backfill(
+            REGIONS,
+            date.fromisoformat(START),
+            date.fromisoformat(END) if END else date.today()
+        )
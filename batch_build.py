@@ -0,0 +1,82 @@
+"""
+Single-pass batch build of every map
+Loads each month's aggregate once (building it from the raw observations
+the first time), writes every monthly page from it, then merges those same
+aggregates into every complete season. The grid is read once for the lot,
+and the count cube (see count_cube) is brought up to date at the end.
+"""
+
+import build_cache
+from checklist_matrix import cell_checklists, merge_matrices, month_matrix
+from count_cube import build_cube
+from generate_map import write_map, write_web_grid
+from month_aggregates import cells_from_sketch, merge_sketches, month_sketch
+from observation_store import list_months, period_name
+from seasons_data import SEASON_MONTHS, get_season, get_season_year
+
+
+GRID_FILE = "grid.geojson"
+
+
+def complete_seasons(months):
+    """
+    {'Winter_2025': [(2025, 10), ...]} for seasons with every month stored.
+    """
+    seasons = {}
+
+    for year, month in months:
+        season = get_season(month)
+        key = f"{season}_{get_season_year(year, month)}"
+        seasons.setdefault(key, []).append((year, month))
+
+    return {
+        key: season_months for key, season_months in seasons.items()
+        if len(season_months) == len(SEASON_MONTHS[key.split("_")[0]])
+    }
+
+
+def build_all(include_seasons=True, grid_file=GRID_FILE):
+
+    months = list_months()
+
+    if not months:
+        print("⚠ No months found in the observation store.")
+        return
+
+    write_web_grid(grid_file)
+
+    # Record what each page was built from, so incremental runs can skip it
+    manifest = build_cache.load_manifest()
+
+    sketches = {key: month_sketch(*key, grid_file=grid_file) for key in months}
+    matrices = {key: month_matrix(*key, grid_file=grid_file) for key in months}
+
+    for key in months:
+        time_period = period_name(*key)
+        write_map(
+            time_period, "monthly", cells_from_sketch(sketches[key]), grid_file,
+            cell_checklists(matrices[key])
+        )
+        build_cache.record(("map", time_period, "monthly"), manifest)
+
+    if include_seasons:
+
+        # Seasons reuse the monthly aggregates, merged in season order
+        for season_name, season_months in complete_seasons(months).items():
+            season_sketch = merge_sketches(sketches[key] for key in season_months)
+            season_matrix = merge_matrices(matrices[key] for key in season_months)
+            write_map(
+                season_name, "seasonal", cells_from_sketch(season_sketch), grid_file,
+                cell_checklists(season_matrix)
+            )
+            build_cache.record(("map", season_name, "seasonal"), manifest)
+
+    build_cache.save_manifest(manifest)
+
+    # Arbitrary date ranges are answered from the cube, which reuses the
+    # sketches built above
+    build_cube(grid_file=grid_file)
+
+
+if __name__ == "__main__":
+    build_all()
@@ -0,0 +1,107 @@
+"""
+Per-cell aggregation: vectorised aggregate_cells vs the old per-cell loop
+
+    python benchmarks/bench_aggregate.py [n_rows]
+
+Rows are synthetic (skewed species and cell frequencies); the two
+implementations are checked for identical output before timing is reported.
+aggregate_cells is the raw-row form of month_aggregates.cells_from_sketch,
+kept here as the reference the sketches were checked against.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from month_aggregates import top_species_lists  # noqa: E402
+
+
+def synthetic_joined(n, n_cells=450, n_species=600, seed=0):
+    rng = np.random.default_rng(seed)
+
+    # Zipf-like skew: a few hotspots and common birds dominate, as in eBird
+    cell_weights = 1 / np.arange(1, n_cells + 1) ** 0.8
+    species_weights = 1 / np.arange(1, n_species + 1) ** 1.1
+
+    grid_ids = rng.choice(n_cells, size=n, p=cell_weights / cell_weights.sum())
+    species = rng.choice(n_species, size=n, p=species_weights / species_weights.sum())
+
+    names = pd.Categorical.from_codes(species, [f"Species {i}" for i in range(n_species)])
+
+    return pd.DataFrame({"grid_id": grid_ids.astype("int32"), "commonName": names})
+
+
+def aggregate_cells(joined, top_n=5, by=()):
+    """
+    Per-cell observation totals and top species in one grouped pass.
+    Returns grid_id, observations, top_species (list, most reported first;
+    ties go to the species seen first, as value_counts does).
+    Extra `by` columns (e.g. a period) aggregate many partitions at once.
+    """
+    keys = list(by) + ["grid_id"]
+    columns = keys + ["observations", "top_species"]
+
+    if joined.empty:
+        return pd.DataFrame(columns=columns)
+
+    observations = joined.groupby(keys, observed=True).size().reset_index(name="observations")
+
+    named = joined[keys + ["commonName"]].dropna(subset=["commonName"])
+    named = named.assign(order=np.arange(len(named)))
+
+    counts = (
+        named.groupby(keys + ["commonName"], observed=True, sort=False)["order"]
+        .agg(count="size", first="min")
+        .reset_index()
+    )
+    top_lists = top_species_lists(counts, keys, top_n)
+
+    observations["top_species"] = [
+        top_lists.get(key, []) for key in observations[keys].itertuples(index=False, name=None)
+    ]
+
+    return observations[columns]
+
+
+def aggregate_cells_loop(joined):
+    summaries = []
+
+    for grid_id, group in joined.groupby("grid_id"):
+        summaries.append({
+            "grid_id": grid_id,
+            "observations": len(group),
+            "top_species": group["commonName"].dropna().astype(str).value_counts().head(5).index.tolist(),
+        })
+
+    return pd.DataFrame(summaries)
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+
+    joined = synthetic_joined(n)
+
+    loop_result, loop_time = timed(aggregate_cells_loop, joined)
+    vec_result, vec_time = timed(aggregate_cells, joined)
+
+    same = (
+        loop_result["grid_id"].tolist() == vec_result["grid_id"].tolist()
+        and loop_result["observations"].tolist() == vec_result["observations"].tolist()
+        and loop_result["top_species"].tolist() == vec_result["top_species"].tolist()
+    )
+
+    print(f"{n:,} rows, {joined['grid_id'].nunique()} cells")
+    print(f"per-cell loop     {loop_time:8.3f}s")
+    print(f"aggregate_cells   {vec_time:8.3f}s  ({loop_time / vec_time:.1f}x)")
+    print(f"identical output: {same}")
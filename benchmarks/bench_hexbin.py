@@ -0,0 +1,65 @@
+"""
+Hex-binning throughput: HexLattice.lookup vs gpd.sjoin
+
+    python benchmarks/bench_hexbin.py [n_points]
+
+Points are drawn uniformly over the grid's extent; sjoin is timed on a
+smaller sample and reported per point.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from hexbin import GRID_FILE, HexLattice  # noqa: E402
+
+
+def random_points(n, seed=0):
+    rng = np.random.default_rng(seed)
+    lat = rng.uniform(15.6, 22.1, n)
+    lng = rng.uniform(72.5, 80.9, n)
+    return lat, lng
+
+
+def bench_lookup(lattice, n):
+    lat, lng = random_points(n)
+
+    start = time.perf_counter()
+    lattice.lookup(lat, lng)
+    elapsed = time.perf_counter() - start
+
+    print(f"HexLattice.lookup  {n:>11,} points  {elapsed:8.3f}s  {n / elapsed:14,.0f} pts/s")
+
+
+def bench_sjoin(grid, n):
+    import geopandas as gpd
+
+    lat, lng = random_points(n)
+
+    start = time.perf_counter()
+    points = gpd.GeoDataFrame(geometry=gpd.points_from_xy(lng, lat), crs="EPSG:4326")
+    gpd.sjoin(points, grid[["grid_id", "geometry"]], how="left", predicate="within")
+    elapsed = time.perf_counter() - start
+
+    print(f"gpd.sjoin          {n:>11,} points  {elapsed:8.3f}s  {n / elapsed:14,.0f} pts/s")
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000_000
+    grid_file = Path(__file__).resolve().parent.parent / GRID_FILE
+
+    lattice = HexLattice.from_geojson(grid_file)
+
+    for size in (100_000, 1_000_000, n):
+        bench_lookup(lattice, size)
+
+    try:
+        import geopandas as gpd
+    except ImportError:
+        print("geopandas not installed; skipping sjoin comparison")
+    else:
+        bench_sjoin(gpd.read_file(grid_file), min(n, 200_000))
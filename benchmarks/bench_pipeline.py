@@ -0,0 +1,279 @@
+"""
+End-to-end pipeline timings on synthetic stores
+
+    python benchmarks/bench_pipeline.py [size ...]      # default: 10k 1M 10M
+
+For each size, a synthetic store is generated (see synthetic_store) and
+these are timed, each in a fresh process so peak memory is its own:
+
+    map_month       generate_map for one month
+    summary_month   generate_summary for the same month
+    season          build_season + seasonal map + seasonal summary (5 months)
+    fetch_month     update_month for one month against mock_ebird, with
+                    the month's share of the rows spread over its days
+
+The page benchmarks run cold (month sketches and the location cache
+deleted first) and warm (straight after, with them in place). Each result
+is appended to benchmarks/results.jsonl with the commit it ran on, so
+changes show up against earlier runs.
+"""
+
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from multiprocessing import get_context
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from synthetic_store import MONTHS, build_store, parse_size  # noqa: E402
+
+import instrument  # noqa: E402
+from hexbin import GRID_FILE  # noqa: E402
+from observation_store import STORE_DIR, period_name  # noqa: E402
+from vocab import TABLES, table_path  # noqa: E402
+
+
+BENCH_DIR = Path(__file__).resolve().parent
+RESULTS_FILE = BENCH_DIR / "results.jsonl"
+
+DEFAULT_SIZES = ["10k", "1M", "10M"]
+
+MONTH = (2024, 10)
+SEASON = ("Winter", 2024)
+
+# Fast enough that the bucket never throttles a local server
+FETCH_RATE = 1000
+
+
+# ---------------------------------------
+# BENCHMARKS
+# ---------------------------------------
+
+def clear_derived(root):
+    """
+    Delete what the pipeline derives from raw rows, for a cold run.
+    """
+    store = root / STORE_DIR
+
+    for path in store.glob("**/aggregates_*.parquet"):
+        path.unlink()
+    for path in store.glob("**/checklists_*.npz"):
+        path.unlink()
+    for path in store.glob("loc_grid_*.parquet"):
+        path.unlink()
+
+
+def bench_map_month():
+    from generate_map import generate_map
+
+    generate_map(period_name(*MONTH), "monthly")
+
+
+def bench_summary_month():
+    from generate_summary import generate_summary
+
+    generate_summary(period_name(*MONTH))
+
+
+def bench_season():
+    from generate_map import generate_map
+    from generate_summary_seasonal import generate_seasonal_summary
+    from seasons_data import build_season
+
+    season, year = SEASON
+    build_season(season, year)
+    generate_map(f"{season}_{year}", "seasonal")
+    generate_seasonal_summary(f"{season}_{year}")
+
+
+def bench_fetch_month(rows):
+    import mock_ebird
+    from incremental_fetch import update_month
+
+    year, month = MONTH
+    records_per_day = max(1, rows // len(MONTHS) // 31)
+
+    server, base_url = mock_ebird.start_server(records_per_day=records_per_day)
+
+    try:
+        stats = update_month(
+            "IN-MH", year, month, "bench", incremental=False,
+            base_url=base_url, rate=FETCH_RATE, cache=False
+        )
+    finally:
+        server.shutdown()
+
+    if stats["failed"]:
+        raise RuntimeError(f"{stats['failed']} day(s) failed")
+
+
+PAGE_BENCHMARKS = {
+    "map_month": bench_map_month,
+    "summary_month": bench_summary_month,
+    "season": bench_season
+}
+
+
+# ---------------------------------------
+# RUNNING
+# ---------------------------------------
+
+def _run(name, root, rows, cold):
+    """
+    Run one benchmark in `root` (a worker process's working directory).
+    """
+    os.chdir(root)
+
+    if cold:
+        clear_derived(root)
+
+    with instrument.isolated() as stages:
+        start = time.perf_counter()
+
+        if name == "fetch_month":
+            bench_fetch_month(rows)
+        else:
+            PAGE_BENCHMARKS[name]()
+
+        seconds = time.perf_counter() - start
+
+    return {
+        "seconds": round(seconds, 4),
+        "peak_rss_mb": instrument.peak_rss_mb(),
+        "stages": {stage: total["seconds"] for stage, total in instrument.totals(stages).items()}
+    }
+
+
+def run_in_process(name, root, rows, cold=False):
+    # Spawned, not forked, so peak RSS doesn't start at the parent's
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+        return pool.submit(_run, name, root, rows, cold).result()
+
+
+def page_workdir(store_root):
+    """
+    A scratch copy of a dataset's layout, sharing its month files: pages
+    and caches are written here, never into the dataset.
+    """
+    workdir = Path(tempfile.mkdtemp(prefix="bench_"))
+    shutil.copy(store_root / GRID_FILE, workdir / GRID_FILE)
+    (workdir / "assets").mkdir()
+
+    # The month files are ids into the dataset's species / location tables
+    paths = [table_path(id_column, store_root / STORE_DIR) for id_column in TABLES]
+    paths += list((store_root / STORE_DIR).glob("**/observations.parquet"))
+
+    for path in paths:
+        target = workdir / path.relative_to(store_root)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.link(path, target)
+        except OSError:
+            shutil.copy(path, target)
+
+    return workdir
+
+
+def run_size(size):
+    label, rows = parse_size(size)
+    store_root = build_store(size)
+
+    results = []
+    workdir = page_workdir(store_root)
+
+    try:
+        for name in PAGE_BENCHMARKS:
+            for cold in (True, False):
+                results.append({"bench": name, "cold": cold, **run_in_process(name, workdir, rows, cold)})
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    fetch_dir = Path(tempfile.mkdtemp(prefix="bench_fetch_"))
+    shutil.copy(store_root / GRID_FILE, fetch_dir / GRID_FILE)
+
+    try:
+        results.append({"bench": "fetch_month", "cold": True, **run_in_process("fetch_month", fetch_dir, rows)})
+    finally:
+        shutil.rmtree(fetch_dir, ignore_errors=True)
+
+    return [{"dataset": label, "rows": rows, **result} for result in results]
+
+
+# ---------------------------------------
+# RESULTS
+# ---------------------------------------
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BENCH_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_results(path=RESULTS_FILE):
+    if not path.exists():
+        return []
+
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def previous_result(history, result):
+    matches = [
+        r for r in history
+        if (r["dataset"], r["bench"], r["cold"]) == (result["dataset"], result["bench"], result["cold"])
+    ]
+    return matches[-1] if matches else None
+
+
+def append_results(results, path=RESULTS_FILE):
+    with open(path, "a", encoding="utf-8") as f:
+        for result in results:
+            f.write(json.dumps(result) + "\n")
+
+
+def report(results, history):
+    print(f"\n{'dataset':>8} {'benchmark':<14} {'run':<5} {'seconds':>9} {'peak MB':>8}  vs last")
+
+    for r in results:
+        last = previous_result(history, r)
+        change = f"{(r['seconds'] / last['seconds'] - 1) * 100:+.0f}% ({last['commit']})" if last else "-"
+
+        print(
+            f"{r['dataset']:>8} {r['bench']:<14} {'cold' if r['cold'] else 'warm':<5} "
+            f"{r['seconds']:9.3f} {r['peak_rss_mb'] or 0:8.0f}  {change}"
+        )
+
+
+if __name__ == "__main__":
+    sizes = sys.argv[1:] or DEFAULT_SIZES
+
+    run_info = {
+        "run_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count()
+    }
+
+    history = load_results()
+    results = []
+
+    for size in sizes:
+        results.extend({**run_info, **result} for result in run_size(size))
+
+    report(results, history)
+    append_results(results)
+
+    print(f"\n✓ Appended {len(results)} results to {RESULTS_FILE.relative_to(BENCH_DIR.parent)}")
@@ -0,0 +1,208 @@
+"""
+Synthetic eBird-scale observation stores for benchmarking
+
+    python benchmarks/synthetic_store.py 1M
+
+Writes N rows (10k, 1M, 10M or any count) into a partitioned store under
+benchmarks/data/<size>/, spread over the twelve months March 2024 to
+February 2025 so every season of 2024 is complete. Generation is
+deterministic and a finished store is reused, so only the first run at
+each size pays for it.
+
+The skew follows real eBird data: a few hundred species with Zipf-like
+frequencies, locations clustered into popular hex cells, a long tail of
+rarely visited locations, and ~15 species per checklist.
+"""
+
+import json
+import shutil
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from hexbin import GRID_FILE  # noqa: E402
+from observation_store import CHUNK_ROWS, STORE_DIR, write_month_chunks  # noqa: E402
+
+
+BENCH_DIR = Path(__file__).resolve().parent
+DATA_DIR = BENCH_DIR / "data"
+REPO_GRID = BENCH_DIR.parent / GRID_FILE
+
+SIZES = {"10k": 10_000, "1M": 1_000_000, "10M": 10_000_000}
+
+MONTHS = [(2024, m) for m in range(3, 13)] + [(2025, 1), (2025, 2)]
+
+N_SPECIES = 600
+SPECIES_PER_CHECKLIST = 15
+
+# Bump when the generator changes, so stale stores are rebuilt
+VERSION = 2
+
+
+def parse_size(size):
+    """
+    '10k' / '1M' / '2500' → (label, rows)
+    """
+    if size in SIZES:
+        return size, SIZES[size]
+
+    rows = int(float(size.lower().rstrip("km")) * {"k": 1e3, "m": 1e6}.get(size[-1].lower(), 1))
+    return size, rows
+
+
+def zipf_weights(n, exponent):
+    weights = 1 / np.arange(1, n + 1) ** exponent
+    return weights / weights.sum()
+
+
+# ---------------------------------------
+# VOCABULARY
+# ---------------------------------------
+
+def cell_centres(grid_file=REPO_GRID):
+    with open(grid_file, encoding="utf-8") as f:
+        features = json.load(f)["features"]
+
+    # Cells are MultiPolygons of one hexagon, centred in their bounding box
+    rings = [np.asarray(f["geometry"]["coordinates"][0][0]) for f in features]
+    centres = np.array([(ring.min(axis=0) + ring.max(axis=0)) / 2 for ring in rings])
+    radius = np.median([(ring.max(axis=0) - ring.min(axis=0)).min() / 2 for ring in rings])
+
+    return centres, radius
+
+
+def make_locations(n_rows, rng, grid_file=REPO_GRID):
+    """
+    (lat, lng, popularity weights) for a location set sized to the data.
+    """
+    n_locations = int(np.clip(n_rows // 25, 200, 100_000))
+
+    centres, radius = cell_centres(grid_file)
+
+    # A shuffled Zipf over cells: hotspot cells anywhere in the state
+    cell_order = rng.permutation(len(centres))
+    cells = cell_order[rng.choice(len(centres), size=n_locations, p=zipf_weights(len(centres), 0.8))]
+
+    jitter = rng.uniform(-0.7 * radius, 0.7 * radius, size=(n_locations, 2))
+    lng, lat = (centres[cells] + jitter).T
+
+    return lat.astype("float32"), lng.astype("float32"), zipf_weights(n_locations, 1.0)
+
+
+def vocabulary(n_locations):
+    species = [f"Species {i:03d}" for i in range(N_SPECIES)]
+
+    return {
+        "speciesCode": [f"spc{i:03d}" for i in range(N_SPECIES)],
+        "commonName": species,
+        "scientificName": [f"Avis {name.split()[1]}" for name in species],
+        "locId": [f"L{i}" for i in range(n_locations)],
+        "locName": [f"Location {i}" for i in range(n_locations)]
+    }
+
+
+# ---------------------------------------
+# ROWS
+# ---------------------------------------
+
+def month_chunk(rows, year, month, chunk, locations, vocab, rng):
+    """
+    One chunk of a month's observations, grouped into checklists.
+    """
+    lat, lng, location_weights = locations
+
+    n_checklists = max(1, rows // SPECIES_PER_CHECKLIST)
+    days_in_month = pd.Period(year=year, month=month, freq="M").days_in_month
+
+    checklist_loc = rng.choice(len(lat), size=n_checklists, p=location_weights)
+    checklist_time = (
+        np.datetime64(f"{year}-{month:02d}-01", "s")
+        + rng.integers(0, days_in_month, n_checklists) * np.timedelta64(86400, "s")
+        + rng.integers(6 * 3600, 18 * 3600, n_checklists) * np.timedelta64(1, "s")
+    )
+
+    checklist = np.sort(rng.integers(0, n_checklists, rows))
+    species = rng.choice(N_SPECIES, size=rows, p=zipf_weights(N_SPECIES, 1.1))
+    loc = checklist_loc[checklist]
+
+    counts = pd.array(rng.geometric(0.35, rows), dtype="Int32")
+    counts[rng.random(rows) < 0.05] = pd.NA  # 'X': present, not counted
+
+    def categorical(column, codes):
+        return pd.Categorical.from_codes(codes, vocab[column])
+
+    return pd.DataFrame({
+        "speciesCode": categorical("speciesCode", species),
+        "commonName": categorical("commonName", species),
+        "scientificName": categorical("scientificName", species),
+        "locId": categorical("locId", loc),
+        "locName": categorical("locName", loc),
+        "observationDate": checklist_time[checklist],
+        "observationCount": counts,
+        "latitude": lat[loc],
+        "longitude": lng[loc],
+        "obsValid": True,
+        "obsReviewed": rng.random(rows) < 0.02,
+        "locationPrivate": rng.random(rows) < 0.1,
+        "subId": pd.Series(checklist).map(f"S{year}{month:02d}{chunk:03d}{{:06d}}".format),
+        "exoticCategory": None
+    })
+
+
+def month_chunks(rows, year, month, locations, vocab, seed):
+    for chunk, start in enumerate(range(0, rows, CHUNK_ROWS)):
+        rng = np.random.default_rng([seed, year, month, chunk])
+        yield month_chunk(min(CHUNK_ROWS, rows - start), year, month, chunk, locations, vocab, rng)
+
+
+# ---------------------------------------
+# STORE
+# ---------------------------------------
+
+def dataset_dir(label):
+    return DATA_DIR / label
+
+
+def build_store(size, seed=0):
+    """
+    Generate (or reuse) the store for `size`. Returns the dataset folder,
+    which holds store/ and grid.geojson and is meant to be the working
+    directory the pipeline runs in.
+    """
+    label, n_rows = parse_size(size)
+    root = dataset_dir(label)
+    marker = root / "dataset.json"
+    spec = {"rows": n_rows, "seed": seed, "version": VERSION, "months": MONTHS}
+
+    if marker.exists() and json.loads(marker.read_text()) == json.loads(json.dumps(spec)):
+        return root
+
+    shutil.rmtree(root, ignore_errors=True)
+    root.mkdir(parents=True)
+    shutil.copy(REPO_GRID, root / GRID_FILE)
+
+    rng = np.random.default_rng(seed)
+    locations = make_locations(n_rows, rng)
+    vocab = vocabulary(len(locations[0]))
+
+    print(f"Generating {n_rows:,} synthetic rows ({len(locations[0]):,} locations) in {root}")
+
+    per_month = np.full(len(MONTHS), n_rows // len(MONTHS))
+    per_month[: n_rows % len(MONTHS)] += 1
+
+    for (year, month), rows in zip(MONTHS, per_month):
+        chunks = month_chunks(int(rows), year, month, locations, vocab, seed)
+        write_month_chunks(chunks, year, month, root=root / STORE_DIR)
+
+    marker.write_text(json.dumps(spec))
+
+    return root
+
+
+if __name__ == "__main__":
+    for size in sys.argv[1:] or ["10k"]:
+        print(f"✓ {build_store(size)}")
@@ -0,0 +1,166 @@
+"""
+Content-hash build cache
+build_manifest.json records, for every generated page, the SHA-256 of each
+input it was built from (month partitions, grid, species names, location
+placements, generator source, asset list). A page is rebuilt only when one of those hashes changes, so a
+refetched month invalidates exactly its own pages and its season's.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+
+from grid_index import placement_revision
+from observation_store import parse_period, partition_path
+from seasons_data import parse_season, season_months
+from species_assets import photo_signature, species_photos
+from vocab import table_path
+
+
+MANIFEST_PATH = Path("build_manifest.json")
+
+GRID_FILE = Path("grid.geojson")
+ASSETS_DIR = Path("assets")
+
+# Generator code, every module whose logic reaches the page (aggregates,
+# cell placement, vocabulary, store reads) and the templates (see rendering)
+SOURCE_DIR = Path(__file__).resolve().parent
+DATA_SOURCES = [
+    "month_aggregates.py", "checklist_matrix.py", "grid_index.py", "hexbin.py",
+    "vocab.py", "observation_store.py", "schema.py", "seasons_data.py", "rendering.py"
+]
+GENERATOR_SOURCES = {
+    "map": ["generate_map.py", *DATA_SOURCES, "templates/map.html"],
+    "summary": [
+        "generate_summary.py", *DATA_SOURCES, "species_assets.py",
+        "templates/summary.html", "templates/species.html"
+    ],
+    "seasonal_summary": [
+        "generate_summary_seasonal.py", *DATA_SOURCES, "species_assets.py",
+        "templates/summary.html", "templates/species.html"
+    ]
+}
+
+
+# ---------------------------------------
+# HASHING
+# ---------------------------------------
+
+def file_digest(path):
+    path = Path(path)
+
+    if not path.exists():
+        return None
+
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+
+    return h.hexdigest()
+
+
+def assets_digest(assets_dir=ASSETS_DIR):
+    """
+    Summaries depend on the species photos (via their index), nothing
+    else in assets/.
+    """
+    signature = photo_signature(species_photos(assets_dir))
+    return hashlib.sha256(json.dumps(signature).encode("utf-8")).hexdigest()
+
+
+# ---------------------------------------
+# TASK → OUTPUTS / INPUTS
+# ---------------------------------------
+
+def period_months(time_period, mode):
+    if mode == "monthly":
+        return [parse_period(time_period)]
+    return season_months(*parse_season(time_period))
+
+
+def period_partitions(time_period, mode):
+    return [partition_path(year, month) for year, month in period_months(time_period, mode)]
+
+
+def task_mode(task):
+    kind = task[0]
+    if kind == "map":
+        return task[2] if len(task) > 2 else "monthly"
+    return "seasonal" if kind == "seasonal_summary" else "monthly"
+
+
+def task_outputs(task):
+    kind, time_period = task[0], task[1]
+
+    if kind == "map":
+        folder = "months" if task_mode(task) == "monthly" else "new seasons"
+        return [Path(folder) / f"{time_period}.html", Path(folder) / f"{time_period}.json"]
+
+    if kind == "summary":
+        return [Path("month summary") / f"{time_period}.html"]
+
+    return [Path("new season summary") / f"{time_period}.html"]
+
+
+def task_inputs(task):
+    """
+    {input name: digest} for everything the task's output depends on.
+    """
+    kind, time_period = task[0], task[1]
+
+    # Pages show species names, which vocab updates in place on a rename
+    paths = period_partitions(time_period, task_mode(task)) + [table_path("species_id")]
+    if kind == "map":
+        paths.append(GRID_FILE)
+
+    inputs = {path.as_posix(): file_digest(path) for path in paths}
+
+    # Bumped when moved locations change cells, which every page shows
+    inputs["loc_grid revision"] = placement_revision(GRID_FILE)
+
+    for name in GENERATOR_SOURCES[kind]:
+        inputs[name] = file_digest(SOURCE_DIR / name)
+
+    if kind != "map":
+        inputs["assets/*"] = assets_digest()
+
+    return inputs
+
+
+# ---------------------------------------
+# MANIFEST
+# ---------------------------------------
+
+def load_manifest(path=MANIFEST_PATH):
+    path = Path(path)
+    if not path.exists():
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_manifest(manifest, path=MANIFEST_PATH):
+    path = Path(path)
+    tmp = path.with_suffix(".json.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    tmp.replace(path)
+
+
+def is_fresh(task, manifest):
+    outputs = task_outputs(task)
+
+    if not all(output.exists() for output in outputs):
+        return False
+
+    entry = manifest.get(outputs[0].as_posix())
+    return entry is not None and entry == task_inputs(task)
+
+
+def stale_tasks(tasks, manifest):
+    return [task for task in tasks if not is_fresh(task, manifest)]
+
+
+def record(task, manifest):
+    manifest[task_outputs(task)[0].as_posix()] = task_inputs(task)
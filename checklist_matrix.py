@@ -0,0 +1,292 @@
+"""
+Checklist × species matrix
+Raw row counts are dominated by a few heavily birded hotspots; per-checklist
+metrics aren't. Each month's observations become a sparse presence matrix
+(one row per checklist, one column per species) with the checklist's cell
+and date alongside, cached next to the month's observations:
+
+    store/region=IN-MH/year=2025/month=01/checklists_v<version>_<grid hash>.npz
+
+    matrix = period_matrix(season_months("Winter", 2025))
+    matrix.checklist_counts()       # checklists per cell
+    matrix.reporting_frequency()    # share of a cell's checklists reporting each species
+    matrix.accumulation_curves()    # species seen vs checklists, per cell
+
+Rows are in date order and columns are species_ids (see vocab), so months
+stack into a period with one vstack and every metric is a sparse product
+or a bincount.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+import instrument
+from grid_index import assign_grid_ids, grid_digest
+from hexbin import GRID_FILE, OUTSIDE_GRID
+from observation_store import REGION_CODE, has_month, iter_month_chunks, partition_dir, period_name
+from vocab import MISSING_ID, species_names
+
+
+MATRIX_PREFIX = "checklists_"
+
+# Bump when build_month_matrix's output changes, so stored matrices are rebuilt
+MATRIX_VERSION = 2
+
+SPECIES_KEYS = ["speciesCode", "commonName", "scientificName"]
+COLUMNS = ["loc_id", "subId", "observationDate", "species_id"]
+
+
+class ChecklistMatrix:
+    """
+    `matrix` is a CSR checklist × species presence matrix whose column
+    is the species_id; `cells` (grid_id) and `dates` (datetime64[D]) have
+    one entry per checklist.
+    """
+
+    def __init__(self, matrix, cells, dates):
+        self.matrix = matrix.tocsr()
+        self.cells = np.asarray(cells, dtype=np.int32)
+        self.dates = np.asarray(dates, dtype="datetime64[D]")
+
+    def __len__(self):
+        return self.matrix.shape[0]
+
+    # ---------------------------------------
+    # METRICS
+    # ---------------------------------------
+
+    def _cell_indicator(self):
+        """
+        (grid_ids, sparse cell × checklist indicator).
+        """
+        grid_ids, rows = np.unique(self.cells, return_inverse=True)
+        indicator = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.int32), (rows, np.arange(len(rows)))),
+            shape=(len(grid_ids), len(rows))
+        )
+        return grid_ids, indicator
+
+    def checklist_counts(self):
+        """
+        Checklists per grid_id.
+        """
+        grid_ids, counts = np.unique(self.cells, return_counts=True)
+        return pd.Series(counts, index=grid_ids, name="checklists")
+
+    def species_frequency(self):
+        """
+        Share of all checklists reporting each species seen.
+        """
+        detections = np.asarray(self.matrix.sum(axis=0)).ravel()
+        seen = np.flatnonzero(detections)
+
+        return species_names(seen).assign(
+            checklists=detections[seen],
+            frequency=detections[seen] / max(len(self), 1)
+        )
+
+    def reporting_frequency(self):
+        """
+        One row per (grid_id, species) seen: checklists reporting it and
+        the share of the cell's checklists that did.
+        """
+        grid_ids, indicator = self._cell_indicator()
+
+        detections = (indicator @ self.matrix).tocoo()
+        totals = np.asarray(indicator.sum(axis=1)).ravel()
+
+        return species_names(detections.col).assign(
+            grid_id=grid_ids[detections.row],
+            checklists=detections.data,
+            frequency=detections.data / totals[detections.row]
+        )[["grid_id", "species_id"] + SPECIES_KEYS + ["checklists", "frequency"]]
+
+    def accumulation_curve(self):
+        """
+        Species seen after each checklist, in date order.
+        """
+        return self._accumulation(np.zeros(len(self), dtype=np.int32))[0]
+
+    def accumulation_curves(self):
+        """
+        {grid_id: species seen after each of the cell's checklists}.
+        """
+        grid_ids, rows = np.unique(self.cells, return_inverse=True)
+        curves = self._accumulation(rows)
+
+        return {int(g): curves[i] for i, g in enumerate(grid_ids)}
+
+    def _accumulation(self, groups):
+        """
+        Curves for each group of checklists (rows keep date order in each).
+        """
+        n_groups = int(groups.max()) + 1 if len(groups) else 0
+
+        # Order rows group by group; rank is a row's position in its group
+        order = np.argsort(groups, kind="stable")
+        sizes = np.bincount(groups, minlength=n_groups)
+        starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+        rank = np.empty(len(groups), dtype=np.int64)
+        rank[order] = np.arange(len(groups)) - np.repeat(starts, sizes)
+
+        # A species' first sighting in a group is its smallest rank there
+        coo = self.matrix.tocoo()
+        keys = groups[coo.row].astype(np.int64) * self.matrix.shape[1] + coo.col
+        first = pd.Series(rank[coo.row]).groupby(keys).min()
+        first_group = (first.index.to_numpy() // max(self.matrix.shape[1], 1)).astype(np.int64)
+
+        new_species = np.zeros(len(groups), dtype=np.int64)
+        np.add.at(new_species, starts[first_group] + first.to_numpy(), 1)
+
+        return [
+            np.cumsum(new_species[start:start + size])
+            for start, size in zip(starts, sizes)
+        ]
+
+
+# ---------------------------------------
+# BUILD / STORE
+# ---------------------------------------
+
+def matrix_path(year, month, region=REGION_CODE, grid_file=GRID_FILE):
+    return partition_dir(year, month, region) / (
+        f"{MATRIX_PREFIX}v{MATRIX_VERSION}_{grid_digest(grid_file)}.npz"
+    )
+
+
+def build_month_matrix(year, month, region=REGION_CODE, grid_file=GRID_FILE):
+    parts = []
+
+    for chunk in iter_month_chunks(year, month, region, columns=COLUMNS):
+        chunk = assign_grid_ids(chunk, grid_file)
+        parts.append(chunk[["subId", "grid_id", "observationDate", "species_id"]])
+
+    rows = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame({
+        "subId": pd.Series(dtype=object),
+        "grid_id": pd.Series(dtype="int32"),
+        "observationDate": pd.Series(dtype="datetime64[s]"),
+        "species_id": pd.Series(dtype="int32")
+    })
+
+    # Checklists in date order; a checklist's first row gives its cell and date
+    checklists = (
+        rows.drop_duplicates("subId")
+        .assign(date=lambda d: pd.to_datetime(d["observationDate"]).dt.floor("D"))
+        .sort_values(["date", "subId"], kind="stable")
+    )
+    row_of = pd.Series(np.arange(len(checklists)), index=checklists["subId"].to_numpy())
+
+    pairs = rows[rows["species_id"] != MISSING_ID][["subId", "species_id"]].drop_duplicates()
+    species_ids = pairs["species_id"].to_numpy()
+
+    matrix = sparse.csr_matrix(
+        (np.ones(len(pairs), dtype=np.int8), (row_of.loc[pairs["subId"]].to_numpy(), species_ids)),
+        shape=(len(checklists), int(species_ids.max()) + 1 if len(species_ids) else 0)
+    )
+
+    return ChecklistMatrix(
+        matrix,
+        checklists["grid_id"].to_numpy(),
+        checklists["date"].to_numpy().astype("datetime64[D]")
+    )
+
+
+def save_matrix(matrix, path):
+    # np.savez keeps a name ending in .npz as it is; per process, since
+    # render workers may build the same month at once
+    tmp = path.with_name(f"{path.stem}.{os.getpid()}.tmp.npz")
+
+    np.savez_compressed(
+        tmp,
+        indptr=matrix.matrix.indptr,
+        indices=matrix.matrix.indices,
+        shape=np.array(matrix.matrix.shape),
+        cells=matrix.cells,
+        dates=matrix.dates
+    )
+    tmp.replace(path)
+
+
+def load_matrix(path):
+    with np.load(path) as data:
+        matrix = sparse.csr_matrix(
+            (np.ones(len(data["indices"]), dtype=np.int8), data["indices"], data["indptr"]),
+            shape=tuple(data["shape"])
+        )
+
+        return ChecklistMatrix(matrix, data["cells"], data["dates"])
+
+
+def month_matrix(year, month, region=REGION_CODE, grid_file=GRID_FILE):
+    """
+    The month's matrix, built and saved on first use. None if the month
+    isn't stored. (write_month deletes it with the other derived files.)
+    """
+    path = matrix_path(year, month, region, grid_file)
+
+    if path.exists():
+        instrument.count(bytes_read=path.stat().st_size)
+        return load_matrix(path)
+
+    if not has_month(year, month, region):
+        return None
+
+    with instrument.stage("aggregate", period_name(year, month)):
+        matrix = build_month_matrix(year, month, region, grid_file)
+        save_matrix(matrix, path)
+        instrument.count(rows=len(matrix), bytes_written=path.stat().st_size)
+
+    return matrix
+
+
+def merge_matrices(matrices):
+    """
+    Stack month matrices in chronological order. None if there are none.
+    """
+    matrices = [m for m in matrices if m is not None]
+
+    if not matrices:
+        return None
+
+    # Columns are species_ids everywhere, so narrower months are just padded
+    width = max(m.matrix.shape[1] for m in matrices)
+    blocks = [
+        sparse.csr_matrix((m.matrix.data, m.matrix.indices, m.matrix.indptr), shape=(len(m), width))
+        for m in matrices
+    ]
+
+    return ChecklistMatrix(
+        sparse.vstack(blocks, format="csr"),
+        np.concatenate([m.cells for m in matrices]),
+        np.concatenate([m.dates for m in matrices])
+    )
+
+
+def period_matrix(months, region=REGION_CODE, grid_file=GRID_FILE):
+    return merge_matrices(month_matrix(y, m, region, grid_file) for y, m in months)
+
+
+# ---------------------------------------
+# PAGE INPUTS
+# ---------------------------------------
+
+def cell_checklists(matrix):
+    """
+    {grid_id: checklists} for cells inside the grid.
+    """
+    counts = matrix.checklist_counts() if matrix is not None else pd.Series(dtype=int)
+    return {int(g): int(n) for g, n in counts.items() if g != OUTSIDE_GRID}
+
+
+def name_frequencies(matrix):
+    """
+    {commonName: share of all checklists reporting it}.
+    """
+    if matrix is None or not len(matrix):
+        return {}
+
+    frequency = matrix.species_frequency()
+    return frequency.groupby("commonName", observed=True)["checklists"].sum().div(len(matrix)).to_dict()
@@ -0,0 +1,400 @@
+"""
+Cell × species × month count cube
+Every stored month collapsed into memory-mapped NumPy arrays, so any range
+of months is a slice and a sum instead of a rescan of raw rows:
+
+    store/region=IN-MH/cube_<grid hash>/
+        counts.npy      int32 [month, cell, species]  observation rows
+        firsts.npy      int32 [month, cell, species]  row of the first one (-1: none)
+        checklists.npy  int32 [month, cell]           distinct subIds
+        vocab.json      months, cells (grid_ids), species (axis length), sources
+
+    cube = load_cube()
+    cube.cells("2023-10", "2025-03")      # the map's grid_id / observations / top_species
+    cube.summary("2023-10", "2025-03")    # the summary page's totals and top species
+
+The month axis runs without gaps from the first stored month to the last
+(unstored months are zeros). Cell 0 is OUTSIDE_GRID, so totals include rows
+that fall outside every hexagon, as the summaries do. Species index i is
+species_id i - 1 (see vocab), with 0 for rows without a species; ids are
+never renumbered, so an index stays valid across rebuilds and new species
+only widen the axis. Top species rank ties by first sighting, exactly as
+the pages do.
+
+Counts come from the month sketches (see month_aggregates) and checklists
+from the month checklist matrices (see checklist_matrix). build_cube only
+redoes months whose partition changed since the last build.
+"""
+
+import json
+import os
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import instrument
+from checklist_matrix import MATRIX_VERSION, month_matrix
+from grid_index import grid_digest, placement_revision
+from hexbin import GRID_FILE, OUTSIDE_GRID
+from month_aggregates import SKETCH_VERSION, month_sketch
+from observation_store import (
+    REGION_CODE, STORE_DIR, list_months, partition_path, period_name
+)
+from vocab import load_table, species_names
+
+
+COUNTS_FILE = "counts.npy"
+FIRSTS_FILE = "firsts.npy"
+CHECKLISTS_FILE = "checklists.npy"
+VOCAB_FILE = "vocab.json"
+
+
+def cube_dir(region=REGION_CODE, grid_file=GRID_FILE):
+    return Path(STORE_DIR) / f"region={region}" / f"cube_{grid_digest(grid_file)}"
+
+
+def month_key(value):
+    """
+    '2023-10', (2023, 10) or a date → (2023, 10). Raises ValueError for
+    anything else, including months outside 1-12.
+    """
+    if isinstance(value, date):
+        return value.year, value.month
+
+    year, month = value.split("-")[:2] if isinstance(value, str) else value
+    year, month = int(year), int(month)
+
+    if not 1 <= month <= 12:
+        raise ValueError(f"month must be 1-12, got {month}")
+
+    return year, month
+
+
+def month_label(year, month):
+    return f"{year}-{month:02d}"
+
+
+def month_ordinal(year, month):
+    return year * 12 + month - 1
+
+
+# ---------------------------------------
+# BUILD
+# ---------------------------------------
+
+def grid_cells(grid_file=GRID_FILE):
+    with open(grid_file, encoding="utf-8") as f:
+        features = json.load(f)["features"]
+
+    return [OUTSIDE_GRID] + sorted(f["properties"]["grid_id"] for f in features)
+
+
+def source_signature(year, month, region=REGION_CODE, grid_file=GRID_FILE):
+    # Derived-file versions and the location placements too, so a sketch or
+    # matrix change or a moved location rebuilds the month
+    stat = partition_path(year, month, region).stat()
+    return [stat.st_size, stat.st_mtime_ns, SKETCH_VERSION, MATRIX_VERSION, placement_revision(grid_file)]
+
+
+def month_checklists(year, month, cell_index, region=REGION_CODE, grid_file=GRID_FILE):
+    """
+    Distinct checklists per cell (cube order) for one month.
+    """
+    per_cell = month_matrix(year, month, region, grid_file).checklist_counts()
+
+    checklists = np.zeros(len(cell_index), dtype=np.int32)
+    checklists[cell_index.loc[per_cell.index].to_numpy()] = per_cell.to_numpy()
+
+    return checklists
+
+
+def month_counts(year, month, cell_index, region=REGION_CODE, grid_file=GRID_FILE):
+    """
+    (cells, species, counts, firsts) for one month from its sketch.
+    """
+    sketch = month_sketch(year, month, region, grid_file)
+
+    return (
+        cell_index.loc[sketch["grid_id"]].to_numpy(),
+        sketch["species_id"].to_numpy(dtype=np.int64) + 1,
+        sketch["count"].to_numpy(),
+        sketch["first"].to_numpy()
+    )
+
+
+def load_vocab(directory):
+    path = Path(directory) / VOCAB_FILE
+
+    if not path.exists():
+        return None
+
+    with open(path, encoding="utf-8") as f:
+        vocab = json.load(f)
+
+    # Cubes from before species_ids listed names; they are rebuilt
+    return vocab if isinstance(vocab["species"], int) else None
+
+
+def build_cube(region=REGION_CODE, grid_file=GRID_FILE):
+    """
+    Bring the cube up to date with the stored months and return it loaded.
+    Unchanged months are copied from the previous cube.
+    """
+    directory = cube_dir(region, grid_file)
+    months = list_months(region)
+
+    if not months:
+        print("⚠ No months found in the observation store.")
+        return None
+
+    old_vocab = load_vocab(directory)
+    old = load_cube(region, grid_file) if old_vocab else None
+
+    cells = grid_cells(grid_file)
+    cell_index = pd.Series(np.arange(len(cells)), index=cells)
+
+    old_sources = old_vocab["sources"] if old_vocab else {}
+
+    first, last = month_ordinal(*months[0]), month_ordinal(*months[-1])
+    span = [divmod(ordinal, 12) for ordinal in range(first, last + 1)]
+    span = [(year, month + 1) for year, month in span]
+
+    sources = {month_label(*key): source_signature(*key, region, grid_file) for key in months}
+    reused = [
+        key for key in months
+        if old is not None and old_sources.get(month_label(*key)) == sources[month_label(*key)]
+    ]
+
+    # Gather the changed months first: they decide how many species there are
+    fresh = {}
+    for year, month in months:
+        if (year, month) not in reused:
+            with instrument.stage("aggregate", period_name(year, month)):
+                fresh[year, month] = (
+                    month_counts(year, month, cell_index, region, grid_file),
+                    month_checklists(year, month, cell_index, region, grid_file)
+                )
+
+    if not fresh and old is not None and old.months == span:
+        print(f"✓ Count cube up to date ({len(span)} months)")
+        return old
+
+    directory.mkdir(parents=True, exist_ok=True)
+    shape = (len(span), len(cells), len(load_table("species_id")) + 1)
+
+    tmp_paths = {
+        name: directory / f"{name}.{os.getpid()}.tmp"
+        for name in (COUNTS_FILE, FIRSTS_FILE, CHECKLISTS_FILE)
+    }
+
+    counts = np.lib.format.open_memmap(tmp_paths[COUNTS_FILE], mode="w+", dtype=np.int32, shape=shape)
+    firsts = np.lib.format.open_memmap(tmp_paths[FIRSTS_FILE], mode="w+", dtype=np.int32, shape=shape)
+    checklists = np.lib.format.open_memmap(tmp_paths[CHECKLISTS_FILE], mode="w+", dtype=np.int32, shape=shape[:2])
+
+    for i, key in enumerate(span):
+        firsts[i] = -1
+
+        if key in fresh:
+            (cell_ids, species_ids, values, first_rows), checklist_counts = fresh[key]
+            counts[i][cell_ids, species_ids] = values
+            firsts[i][cell_ids, species_ids] = first_rows
+            checklists[i] = checklist_counts
+
+        elif key in reused:
+            j = old.month_index(*key)
+            counts[i, :, : old.counts.shape[2]] = old.counts[j]
+            firsts[i, :, : old.firsts.shape[2]] = old.firsts[j]
+            checklists[i] = old.checklists[j]
+
+    for array in (counts, firsts, checklists):
+        array.flush()
+    del counts, firsts, checklists, old
+
+    vocab = {
+        "months": [month_label(*key) for key in span],
+        "cells": [int(cell) for cell in cells],
+        "species": shape[2],
+        "sources": sources
+    }
+
+    for name, tmp in tmp_paths.items():
+        tmp.replace(directory / name)
+
+    # The vocabulary goes last: it is what marks the arrays as complete
+    tmp = directory / f"{VOCAB_FILE}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(vocab, f)
+    tmp.replace(directory / VOCAB_FILE)
+
+    print(
+        f"✓ Count cube: {shape[0]} months × {shape[1]} cells × {shape[2]} species "
+        f"({len(fresh)} month(s) rebuilt, {len(reused)} reused)"
+    )
+
+    return load_cube(region, grid_file)
+
+
+# ---------------------------------------
+# QUERY
+# ---------------------------------------
+
+class CountCube:
+    """
+    Read-only view of a built cube. Ranges are inclusive months given as
+    '2023-10', (2023, 10) or dates; None means the first / last month.
+    """
+
+    def __init__(self, directory):
+        vocab = load_vocab(directory)
+
+        self.months = [month_key(label) for label in vocab["months"]]
+        self.grid_ids = np.array(vocab["cells"], dtype=np.int32)
+        self.species = species_names(
+            np.arange(vocab["species"]) - 1, ["commonName", "scientificName"]
+        ).drop(columns="species_id")
+
+        self.counts = np.load(Path(directory) / COUNTS_FILE, mmap_mode="r")
+        self.firsts = np.load(Path(directory) / FIRSTS_FILE, mmap_mode="r")
+        self.checklists = np.load(Path(directory) / CHECKLISTS_FILE, mmap_mode="r")
+
+        self._first = month_ordinal(*self.months[0])
+
+    def month_index(self, year, month):
+        return month_ordinal(year, month) - self._first
+
+    def month_slice(self, start=None, end=None):
+        first = 0 if start is None else self.month_index(*month_key(start))
+        last = len(self.months) - 1 if end is None else self.month_index(*month_key(end))
+
+        # Months outside the cube hold no data, so clipping is exact
+        return slice(max(first, 0), max(min(last, len(self.months) - 1) + 1, 0))
+
+    def window(self, start=None, end=None):
+        """
+        ([cell, species] counts, [cell] checklists) summed over the range.
+        """
+        months = self.month_slice(start, end)
+
+        counts = self.counts[months].sum(axis=0, dtype=np.int64)
+        checklists = self.checklists[months].sum(axis=0, dtype=np.int64)
+
+        return counts, checklists
+
+    def first_seen(self, start=None, end=None):
+        """
+        [cell, species] sort keys for the first sighting in the range:
+        earlier months first, then earlier rows. Absent pairs sort last.
+        """
+        months = self.month_slice(start, end)
+        keys = np.full(self.counts.shape[1:], np.iinfo(np.int64).max)
+
+        for i in range(months.start, months.stop):
+            firsts = self.firsts[i]
+            new = (firsts >= 0) & (keys == np.iinfo(np.int64).max)
+            keys[new] = (i << 32) + firsts[new].astype(np.int64)
+
+        return keys
+
+    def cells(self, start=None, end=None, top_n=5):
+        """
+        grid_id / observations / checklists / top_species for every cell
+        with observations, as cells_from_sketch gives for a period.
+        """
+        counts, checklists = self.window(start, end)
+        first_seen = self.first_seen(start, end)
+
+        in_grid = np.flatnonzero(self.grid_ids != OUTSIDE_GRID)
+        observations = counts[in_grid].sum(axis=1)
+        seen = in_grid[observations > 0]
+
+        named = self.species["commonName"].notna().to_numpy()
+        ranked = counts[np.ix_(seen, np.flatnonzero(named))]
+        order = first_seen[np.ix_(seen, np.flatnonzero(named))]
+        names = self.species["commonName"][named].to_numpy()
+
+        top = np.lexsort((order, -ranked), axis=1)[:, :top_n]
+        top_species = [
+            [names[s] for s in row if ranked[i, s] > 0] for i, row in enumerate(top)
+        ]
+
+        return pd.DataFrame({
+            "grid_id": self.grid_ids[seen],
+            "observations": counts[seen].sum(axis=1),
+            "checklists": checklists[seen],
+            "top_species": top_species
+        })
+
+    def species_cells(self, common_name, start=None, end=None):
+        """
+        Per-cell observations of one species with the cell's checklists.
+        """
+        matches = np.flatnonzero(self.species["commonName"].to_numpy() == common_name)
+        counts, checklists = self.window(start, end)
+
+        observations = counts[:, matches].sum(axis=1)
+        keep = (observations > 0) & (self.grid_ids != OUTSIDE_GRID)
+
+        return pd.DataFrame({
+            "grid_id": self.grid_ids[keep],
+            "observations": observations[keep],
+            "checklists": checklists[keep]
+        })
+
+    def summary(self, start=None, end=None, top_n=3):
+        """
+        (total observations, species richness, top species as Name/Count),
+        as summary_from_sketch gives for a period.
+        """
+        counts, _ = self.window(start, end)
+        per_species = counts.sum(axis=0)
+
+        present = self.species[per_species > 0]
+        richness = int(present["scientificName"].dropna().nunique())
+
+        named = (
+            self.species.assign(count=per_species, first=self.first_seen(start, end).min(axis=0))
+            .dropna(subset=["commonName"])
+            .groupby("commonName", observed=True, sort=False)
+            .agg(count=("count", "sum"), first=("first", "min"))
+            .reset_index()
+        )
+        named = (
+            named[named["count"] > 0]
+            .sort_values(["count", "first"], ascending=[False, True])
+            .head(top_n)
+        )
+
+        top = pd.DataFrame({
+            "Name": named["commonName"].astype(str).to_numpy(),
+            "Count": named["count"].to_numpy()
+        })
+
+        return int(counts.sum()), richness, top
+
+
+def load_cube(region=REGION_CODE, grid_file=GRID_FILE):
+    """
+    The built cube, or None if there isn't one yet (see build_cube).
+    """
+    directory = cube_dir(region, grid_file)
+
+    if load_vocab(directory) is None:
+        return None
+
+    return CountCube(directory)
+
+
+if __name__ == "__main__":
+    import sys
+
+    cube = build_cube()
+
+    if cube is not None and len(sys.argv) == 3:
+        start, end = sys.argv[1:]
+        total, richness, top = cube.summary(start, end)
+
+        print(f"\n{start} to {end}: {total:,} observations, {richness} species")
+        print(top.to_string(index=False))
+        print(cube.cells(start, end).head(10).to_string(index=False))
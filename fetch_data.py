@@ -1,74 +1,39 @@
 # EXECUTED MONTHLY
 
-import requests
-import pandas as pd
-import calendar
 from datetime import datetime
-from pathlib import Path
 import os
-import time
+
+import instrument
+from incremental_fetch import update_month
 
 
 EBIRD_API_KEY = os.getenv("EBIRD_API_KEY")
 REGION_CODE = "IN-MH"
-BASE_URL = "https://api.ebird.org/v2/data/obs"
 
 
-def fetch_full_month(year, month):
+def fetch_full_month(year, month, incremental=True, region=REGION_CODE):
 
     if not EBIRD_API_KEY:
         raise ValueError("EBIRD_API_KEY not set")
 
-    month_name = calendar.month_name[month]
-    start_date = datetime(year, month, 1)
-    end_day = calendar.monthrange(year, month)[1]
-
-    all_records = []
-
-    for day in range(1, end_day + 1):
-
-        date_str = f"{year}/{month:02d}/{day:02d}"
-        url = f"{BASE_URL}/{REGION_CODE}/historic/{date_str}"
-
-        headers = {"X-eBirdApiToken": EBIRD_API_KEY}
-
-        response = requests.get(url, headers=headers)
-
-        if response.status_code != 200:
-            print(f"Skipped {date_str}")
-            continue
-
-        daily_data = response.json()
-        all_records.extend(daily_data)
-
-        print(f"{date_str} → {len(daily_data)} records")
+    stats = update_month(region, year, month, EBIRD_API_KEY, incremental=incremental)
 
-        time.sleep(0.4)
-
-    if not all_records:
-        print("No data found.")
-        return
-
-    df = pd.DataFrame(all_records)
-
-    df = df.rename(columns={
-        "comName": "commonName",
-        "sciName": "scientificName",
-        "obsDt": "observationDate",
-        "howMany": "observationCount",
-        "lat": "latitude",
-        "lng": "longitude"
-    })
-
-    output_dir = Path("months")
-    output_dir.mkdir(exist_ok=True)
-
-    output_path = output_dir / f"{month_name}_{year}.csv"
-    df.to_csv(output_path, index=False)
-
-    print(f"Saved: {output_path}")
+    # Never save a month with holes in it; completed days stay staged
+    if stats["failed"]:
+        missing = ", ".join(f"{day:%Y/%m/%d}" for day in stats["failed_days"])
+        raise RuntimeError(
+            f"{stats['failed']} day(s) failed after retries ({missing}). "
+            f"Rerun to fetch only the missing days."
+        )
 
 
 if __name__ == "__main__":
     today = datetime.today()
-    fetch_full_month(today.year, today.month)
+
+    # Top up last month's late checklists before starting on this one
+    previous_month = today.month - 1 or 12
+    previous_year = today.year if today.month != 1 else today.year - 1
+
+    with instrument.run("fetch_data"):
+        fetch_full_month(previous_year, previous_month)
+        fetch_full_month(today.year, today.month)
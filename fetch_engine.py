@@ -0,0 +1,307 @@
+"""
+Concurrent eBird fetch engine
+Fetches many /historic/{date} days in parallel over one pooled connection,
+throttled by a token bucket so the total request rate stays within quota.
+"""
+
+import asyncio
+import calendar
+import json
+import os
+import random
+import time
+from datetime import date, timedelta
+
+import aiohttp
+import pandas as pd
+
+import http_cache
+import instrument
+
+
+# ---------------------------------------
+# CONFIG
+# ---------------------------------------
+
+BASE_URL = "https://api.ebird.org/v2/data/obs"
+
+# Requests per second allowed across all workers, and how many may be in flight
+RATE_LIMIT = float(os.getenv("EBIRD_RATE_LIMIT", "4"))
+CONCURRENCY = int(os.getenv("EBIRD_CONCURRENCY", "8"))
+
+# Per-day retry policy: exponential backoff with full jitter, capped
+MAX_RETRIES = int(os.getenv("EBIRD_MAX_RETRIES", "5"))
+BACKOFF_BASE = 1.0
+BACKOFF_CAP = 60.0
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+COLUMN_RENAMES = {
+    "comName": "commonName",
+    "sciName": "scientificName",
+    "obsDt": "observationDate",
+    "howMany": "observationCount",
+    "lat": "latitude",
+    "lng": "longitude"
+}
+
+
+# ---------------------------------------
+# RATE LIMITING
+# ---------------------------------------
+
+class TokenBucket:
+    """
+    Allows `rate` acquisitions per second on average, with bursts of up to
+    `capacity` once the bucket has had time to refill.
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(
+                    self.capacity,
+                    self.tokens + (now - self.updated) * self.rate
+                )
+                self.updated = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+# ---------------------------------------
+# DATES
+# ---------------------------------------
+
+def month_dates(year, month):
+    end_day = calendar.monthrange(year, month)[1]
+    return [date(year, month, day) for day in range(1, end_day + 1)]
+
+
+def date_range(start, end):
+    days = (end - start).days
+    return [start + timedelta(days=i) for i in range(days + 1)]
+
+
+def day_url(region, day, base_url=BASE_URL):
+    return f"{base_url}/{region}/historic/{day:%Y/%m/%d}"
+
+
+# ---------------------------------------
+# FETCHING
+# ---------------------------------------
+
+def backoff_delay(attempt, retry_after=None):
+    """
+    Seconds to wait before retry number `attempt` (0-based).
+    A server-sent Retry-After always wins over our own schedule.
+    """
+    if retry_after is not None:
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            pass
+
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+
+async def _fetch_day(session, bucket, semaphore, region, day, base_url, stats,
+                     max_retries=MAX_RETRIES, cache=None):
+
+    url = day_url(region, day, base_url)
+
+    cached = cache.get(url) if cache else None
+
+    # Settled days never change, so a cached copy costs no request at all
+    if cached and http_cache.is_fresh(cached, day):
+        stats["cache_hits"] += 1
+        return day, cached["records"]
+
+    headers = {"If-None-Match": cached["etag"]} if cached and cached.get("etag") else {}
+
+    async with semaphore:
+        for attempt in range(max_retries + 1):
+            await bucket.acquire()
+            stats["requests"] += 1
+
+            retry_after = None
+
+            try:
+                async with session.get(url, headers=headers) as response:
+                    if response.status == 304 and cached:
+                        cache.touch(url, cached)
+                        stats["revalidated"] += 1
+                        return day, cached["records"]
+
+                    if response.status == 200:
+                        body = await response.read()
+                        stats["bytes"] += len(body)
+                        daily_data = json.loads(body)
+                        if cache:
+                            cache.put(url, daily_data, response.headers.get("ETag"))
+                        break
+
+                    if response.status not in RETRY_STATUSES:
+                        print(f"Skipped {day:%Y/%m/%d} (HTTP {response.status})")
+                        return day, None
+
+                    reason = f"HTTP {response.status}"
+                    retry_after = response.headers.get("Retry-After")
+
+            # A truncated or garbled 200 body is as transient as a dropped connection
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                reason = type(e).__name__
+
+            if attempt == max_retries:
+                print(f"Skipped {day:%Y/%m/%d} ({reason}, gave up after {attempt + 1} attempts)")
+                return day, None
+
+            delay = backoff_delay(attempt, retry_after)
+            stats["retries"] += 1
+            print(f"Retrying {day:%Y/%m/%d} in {delay:.1f}s ({reason})", flush=True)
+            await asyncio.sleep(delay)
+
+    print(f"{day:%Y/%m/%d} → {len(daily_data)} records", flush=True)
+
+    return day, daily_data
+
+
+async def fetch_jobs_async(jobs, api_key, base_url=BASE_URL,
+                           rate=RATE_LIMIT, concurrency=CONCURRENCY,
+                           bucket=None, max_retries=MAX_RETRIES,
+                           on_day=None, cache=None):
+    """
+    Fetch (region, day) jobs in the order given, `concurrency` at a time,
+    all drawing on one token bucket. Workers take the next job only when
+    they're free, so jobs early in the list are fetched first. Responses
+    go through the on-disk cache (see http_cache) unless cache=False.
+    Returns ({(region, day): records or None}, stats).
+    """
+    bucket = bucket or TokenBucket(rate)
+    semaphore = asyncio.Semaphore(concurrency)
+    stats = {"requests": 0, "retries": 0, "cache_hits": 0, "revalidated": 0, "bytes": 0}
+
+    if cache is None:
+        cache = http_cache.default_cache()
+
+    queue = iter(jobs)
+    results = {}
+
+    async def worker(session):
+        for region, day in queue:
+            day, daily_data = await _fetch_day(
+                session, bucket, semaphore, region, day, base_url, stats, max_retries, cache
+            )
+
+            if on_day is None or daily_data is None:
+                results[region, day] = daily_data
+                continue
+
+            # Hand the day off as soon as it arrives and keep only its size
+            on_day(region, day, daily_data)
+            results[region, day] = len(daily_data)
+
+    headers = {"X-eBirdApiToken": api_key}
+    connector = aiohttp.TCPConnector(limit=concurrency)
+
+    start = time.perf_counter()
+
+    async with aiohttp.ClientSession(headers=headers, connector=connector) as session:
+        await asyncio.gather(*[worker(session) for _ in range(concurrency)])
+
+    elapsed = time.perf_counter() - start
+
+    stats["days"] = len(results)
+    stats["failed_days"] = sorted(job for job, data in results.items() if data is None)
+    stats["failed"] = len(stats["failed_days"])
+    stats["elapsed"] = elapsed
+    stats["requests_per_sec"] = stats["requests"] / elapsed if elapsed else 0.0
+
+    instrument.count(
+        requests=stats["requests"], retries=stats["retries"],
+        cache_hits=stats["cache_hits"], bytes_read=stats["bytes"]
+    )
+
+    return results, stats
+
+
+async def fetch_days_async(region, days, api_key, on_day=None, **kwargs):
+
+    day_callback = (lambda _, day, records: on_day(day, records)) if on_day else None
+
+    results, stats = await fetch_jobs_async(
+        [(region, day) for day in days], api_key, on_day=day_callback, **kwargs
+    )
+
+    stats["failed_days"] = [day for _, day in stats["failed_days"]]
+
+    return {day: data for (_, day), data in results.items()}, stats
+
+
+def _report(stats):
+    print(
+        f"Fetched {stats['days'] - stats['failed']}/{stats['days']} days "
+        f"in {stats['elapsed']:.1f}s ({stats['requests_per_sec']:.2f} req/s, "
+        f"{stats['retries']} retries, {stats['cache_hits']} from cache, "
+        f"{stats['revalidated']} revalidated)"
+    )
+
+
+def fetch_days(region, days, api_key, **kwargs):
+    """
+    Fetch every day in `days` for `region`.
+    Returns ({date: records or None}, stats). With on_day=callback each
+    day's records are passed to on_day(day, records) as they arrive and
+    only their count is kept in the results.
+    """
+    results, stats = asyncio.run(fetch_days_async(region, days, api_key, **kwargs))
+    _report(stats)
+    return results, stats
+
+
+def fetch_jobs(jobs, api_key, **kwargs):
+    """
+    Like fetch_days for (region, day) jobs across several regions;
+    on_day is called as on_day(region, day, records).
+    """
+    results, stats = asyncio.run(fetch_jobs_async(jobs, api_key, **kwargs))
+    _report(stats)
+    return results, stats
+
+
+# ---------------------------------------
+# NORMALIZING
+# ---------------------------------------
+
+def day_frame(records):
+    """
+    One day's records as a DataFrame with the column names used
+    throughout the repo.
+    """
+    return pd.DataFrame(records).rename(columns=COLUMN_RENAMES)
+
+
+def records_to_frame(results):
+    """
+    Flatten {date: records} into one DataFrame, in date order.
+    """
+    all_records = []
+
+    for day in sorted(results):
+        if results[day]:
+            all_records.extend(results[day])
+
+    if not all_records:
+        return pd.DataFrame()
+
+    return day_frame(all_records)
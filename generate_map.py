@@ -1,207 +1,129 @@
-import pandas as pd
-import geopandas as gpd
+import json
+import os
 from pathlib import Path
 
-
-def generate_map(time_period, mode="monthly"):
-
+import instrument
+from checklist_matrix import cell_checklists, period_matrix
+from month_aggregates import cells_from_sketch, period_sketch
+from observation_store import parse_period
+from rendering import map_page, write_page
+from seasons_data import parse_season, season_months
+
+
+# Geometry is written once and shared by every period page; ~1 m precision
+# is far finer than the ~18 km hexagons need.
+WEB_GRID_FILE = Path("grid_web.geojson")
+COORD_DECIMALS = 5
+
+
+def _round_coords(coords):
+    if isinstance(coords[0], (int, float)):
+        return [round(c, COORD_DECIMALS) for c in coords]
+    return [_round_coords(c) for c in coords]
+
+
+def write_web_grid(grid_file="grid.geojson", output_path=WEB_GRID_FILE):
+    """
+    Write the compact grid the map pages load: rounded coordinates and
+    only the grid_id property. Skipped when the file is already current.
+    """
+    with open(grid_file, encoding="utf-8") as f:
+        grid = json.load(f)
+
+    web_grid = {
+        "type": "FeatureCollection",
+        "features": [
+            {
+                "type": "Feature",
+                "properties": {"grid_id": feature["properties"]["grid_id"]},
+                "geometry": {
+                    "type": feature["geometry"]["type"],
+                    "coordinates": _round_coords(feature["geometry"]["coordinates"])
+                }
+            }
+            for feature in grid["features"]
+        ]
+    }
+
+    text = json.dumps(web_grid, separators=(",", ":"))
+
+    output_path = Path(output_path)
+    if output_path.exists() and output_path.read_text(encoding="utf-8") == text:
+        return output_path
+
+    # Write then rename, so parallel renders never see a half-written grid
+    tmp = output_path.with_name(f"{output_path.name}.{os.getpid()}.tmp")
+    tmp.write_text(text, encoding="utf-8")
+    tmp.replace(output_path)
+    print(f"✓ Web grid written: {output_path}")
+
+    return output_path
+
+
+def cell_data(summary_df, time_period, checklists=None):
+    """
+    The per-period attribute file: grid_id → observations / checklists /
+    top species. `checklists` is {grid_id: checklists} (see checklist_matrix).
+    """
+    checklists = checklists or {}
+
+    cells = {
+        str(row.grid_id): {
+            "observations": int(row.observations),
+            "checklists": checklists.get(int(row.grid_id), 0),
+            "top_species": row.top_species
+        }
+        for row in summary_df.itertuples(index=False)
+    }
+
+    return json.dumps({"period": time_period, "cells": cells}, separators=(",", ":"))
+
+
+def write_map(time_period, mode, summary_df, grid_file="grid.geojson", checklists=None):
+    """
+    Write the map page and its per-period cell data from an aggregate.
+    """
     if mode == "monthly":
-        csv_path = Path(f"months/{time_period}.csv")
         output_path = Path(f"months/{time_period}.html")
-        grid_file = "grid.geojson"
 
     elif mode == "seasonal":
-        csv_path = Path(f"new seasons/{time_period}.csv")
         output_path = Path(f"new seasons/{time_period}.html")
-        grid_file = "grid.geojson"
 
     else:
         raise ValueError("Mode must be 'monthly' or 'seasonal'")
 
-    if not csv_path.exists():
-        print(f"⚠ {csv_path} not found. Skipping.")
-        return
+    web_grid = write_web_grid(grid_file)
+    data_path = output_path.with_suffix(".json")
+
+    with instrument.stage("render", time_period):
+        instrument.count(rows=len(summary_df))
+        write_page(data_path, cell_data(summary_df, time_period, checklists))
+        write_page(output_path, map_page(time_period, web_grid.as_posix(), data_path.name))
+
+    print(f"✓ {mode.capitalize()} map generated: {time_period}")
+
+
+def generate_map(time_period, mode="monthly"):
 
-    df = pd.read_csv(csv_path)
+    grid_file = "grid.geojson"
 
-    # Standardize column names
-    df = df.rename(columns={
-        "lat": "latitude",
-        "lng": "longitude",
-        "comName": "commonName",
-        "sciName": "scientificName",
-        "obsDt": "observationDate",
-        "howMany": "observationCount"
-    })
+    if mode == "monthly":
+        months = [parse_period(time_period)]
 
-    if df.empty or "longitude" not in df.columns:
-        print(f"⚠ {time_period} empty or invalid.")
+    elif mode == "seasonal":
+        months = season_months(*parse_season(time_period))
+
+    else:
+        raise ValueError("Mode must be 'monthly' or 'seasonal'")
+
+    # Built from the months' stored aggregates, not a rescan of raw rows
+    sketch = period_sketch(months, grid_file=grid_file)
+
+    if sketch is None:
+        print(f"⚠ No stored data for {time_period}. Skipping.")
         return
 
-    gdf_points = gpd.GeoDataFrame(
-        df,
-        geometry=gpd.points_from_xy(df.longitude, df.latitude),
-        crs="EPSG:4326"
-    )
-
-    grid = gpd.read_file(grid_file).to_crs("EPSG:4326")
-
-    # Remove leftover spatial join columns
-    for col in ["index_left", "index_right"]:
-        if col in gdf_points.columns:
-            gdf_points = gdf_points.drop(columns=[col])
-        if col in grid.columns:
-            grid = grid.drop(columns=[col])
-
-    joined = gpd.sjoin(
-        gdf_points,
-        grid,
-        how="inner",
-        predicate="within"
-    )
-
-    summaries = []
-
-    if not joined.empty:
-
-        for grid_id, group in joined.groupby("grid_id"):
-
-            summaries.append({
-                "grid_id": grid_id,
-                "observations": len(group),
-                "top_species": group["commonName"].dropna().value_counts().head(5).index.tolist(),
-            })
-
-    summary_df = pd.DataFrame(summaries)
-
-    if not summary_df.empty:
-        grid = grid.merge(summary_df, on="grid_id", how="left")
-
-    grid["observations"] = grid.get("observations", 0).fillna(0)
-
-    geojson_grid = grid.to_json()
-
-    html = f"""
-<!DOCTYPE html>
-<html>
-<head>
-<meta charset="utf-8"/>
-<title>{time_period}</title>
-
-<link rel="stylesheet" href="https://unpkg.com/leaflet-control-geocoder/dist/Control.Geocoder.css" />
-<script src="https://unpkg.com/leaflet-control-geocoder/dist/Control.Geocoder.js"></script>
-<link rel="stylesheet"
- href="https://unpkg.com/leaflet/dist/leaflet.css"/>
-<script src="https://unpkg.com/leaflet/dist/leaflet.js"></script>
-
-<style>
-html, body {{ margin:0; height:100%; }}
-#map {{ height:100%; }}
-.leaflet-popup-content {{
-    font-size: 14px;
-}}
-</style>
-</head>
-<body>
-
-<div id="map"></div>
-
-<script>
-
-var defaultCenter = [19.5, 75.3];
-var defaultZoom = 6;
-var map = L.map('map').setView(defaultCenter, defaultZoom);
-
-L.tileLayer(
-  'https://{{s}}.tile.openstreetmap.org/{{z}}/{{x}}/{{y}}.png',
-  {{
-    attribution: '© OpenStreetMap contributors'
-  }}
-).addTo(map);
-
-var gridData = {geojson_grid};
-
-function getColor(d) {{
-  return d > 500 ? '#00441b' :
-         d > 200 ? '#006d2c' :
-         d > 100 ? '#238b45' :
-         d > 50  ? '#41ab5d' :
-         d > 20  ? '#74c476' :
-         d > 0   ? '#a1d99b' :
-                   '#f7fcf5';
-}}
-
-function style(feature) {{
-  return {{
-    fillColor: getColor(feature.properties.observations || 0),
-    weight: 1,
-    color: '#555',
-    fillOpacity: 0.7
-  }};
-}}
-
-function onEachGrid(feature, layer) {{
-  var p = feature.properties;
-
-  var content =
-    "<b>{time_period}</b><br>" +
-    "Grid ID: " + (p.grid_id || "") + "<br>" +
-    "Observations: " + (p.observations || 0) + "<br><br>" +
-
-    "<b>Top species:</b><br>" +
-    (p.top_species || []).join("<br>") + "<br><br>";
-
-  layer.bindPopup(content);
-}}
-
-L.geoJSON(gridData, {{
-  style: style,
-  onEachFeature: onEachGrid
-}}).addTo(map);
-
-L.Control.geocoder({{
-    defaultMarkGeocode: true
-}})
-.on('markgeocode', function(e) {{
-    var bbox = e.geocode.bbox;
-    var poly = L.polygon([
-        bbox.getSouthEast(),
-        bbox.getNorthEast(),
-        bbox.getNorthWest(),
-        bbox.getSouthWest()
-    ]);
-    map.fitBounds(poly.getBounds());
-}})
-.addTo(map);
-
-var resetControl = L.control({{position: 'topleft'}});
-
-resetControl.onAdd = function(map) {{
-    var div = L.DomUtil.create('div', 'leaflet-bar leaflet-control leaflet-control-custom');
-    div.style.backgroundColor = 'white';
-    div.style.width = '100px';
-    div.style.height = '30px';
-    div.style.lineHeight = '30px';
-    div.style.textAlign = 'center';
-    div.style.cursor = 'pointer';
-    div.innerHTML = "Reset View";
-
-    div.onclick = function() {{
-        map.setView(defaultCenter, defaultZoom);
-    }};
-
-    return div;
-}};
-
-resetControl.addTo(map);
-
-</script>
-</body>
-</html>
-"""
-    output_path.parent.mkdir(exist_ok=True)
-
-    with open(output_path, "w", encoding="utf-8") as f:
-        f.write(html)
+    summary_df = cells_from_sketch(sketch)
+    checklists = cell_checklists(period_matrix(months, grid_file=grid_file))
 
-    print(f"✓ {mode.capitalize()} map generated: {time_period}")
+    write_map(time_period, mode, summary_df, grid_file, checklists)
@@ -1,83 +1,39 @@
-import pandas as pd
 from pathlib import Path
 
+import instrument
+from checklist_matrix import name_frequencies, period_matrix
+from month_aggregates import period_sketch, summary_from_sketch
+from rendering import summary_page, write_page
+from seasons_data import parse_season, season_months
+from species_assets import image_html
+
 
 def generate_seasonal_summary(season_year):
 
-    csv_path = Path(f"new seasons/{season_year}.csv")
+    # A season is the merge of its months' stored aggregates
+    months = season_months(*parse_season(season_year))
+    sketch = period_sketch(months)
 
-    if not csv_path.exists():
-        print(f"⚠ Seasonal CSV not found for {season_year}.")
+    if sketch is None:
+        print(f"⚠ No stored months for {season_year}.")
         return
 
-    df = pd.read_csv(csv_path)
-
-    if df.empty:
+    if sketch.empty:
         print(f"⚠ {season_year} empty.")
         return
 
-    total_observations = len(df)
-    species_richness = df["scientificName"].nunique()
-
-    def top3(col):
-        if col not in df.columns:
-            return pd.DataFrame(columns=["Name", "Count"])
-        t = df[col].dropna().value_counts().head(3).reset_index()
-        t.columns = ["Name", "Count"]
-        return t
-
-    top_species = top3("commonName")
-
-    html = f"""
-<!DOCTYPE html>
-<html>
-<head>
-<meta charset="utf-8"/>
-<title>{season_year} Seasonal Summary</title>
-<style>
-body {{font-family:Arial; padding:30px;}}
-.card {{background:#f2f2f2; padding:20px; border-radius:10px; margin-bottom:20px;}}
-img {{max-width:200px; border-radius:8px; margin-top:10px;}}
-</style>
-</head>
-<body>
-
-<h1>{season_year} Seasonal Summary</h1>
-
-<div class="card">
-<b>Total Observations:</b> {total_observations}<br>
-<b>Total Species:</b> {species_richness}
-</div>
-
-<div class="card"><b>Top 3 Species</b><br>
-"""
-
-    assets_path = Path("assets")
-
-    for _, row in top_species.iterrows():
-        species = row["Name"]
-        count = row["Count"]
-        img_tag = ""
-
-        found = False
-        for ext in ["jpg", "png", "jpeg"]:
-            if (assets_path / f"{species}.{ext}").exists():
-                img_tag = f'<img src="../assets/{species}.{ext}">'
-                found = True
-                break
-
-        if not found:
-            img_tag = f"<p><i>img not found: {species}</i></p>"
-
-        html += f"<b>{species}</b><br>{img_tag}<br><br>"
+    with instrument.stage("render", season_year):
+        total_observations, species_richness, top_species = summary_from_sketch(sketch)
 
-    html += "</div>"
-    html += "</body></html>"
+        matrix = period_matrix(months)
+        frequencies = name_frequencies(matrix)
 
-    output_path = Path("new season summary")
-    output_path.mkdir(exist_ok=True)
+        html = summary_page(
+            f"{season_year} Seasonal Summary", "Total Species", total_observations, species_richness,
+            len(matrix),
+            [(species, frequencies.get(species, 0), image_html(species)) for species in top_species["Name"]]
+        )
 
-    with open(output_path / f"{season_year}.html", "w", encoding="utf-8") as f:
-        f.write(html)
+        write_page(Path("new season summary") / f"{season_year}.html", html)
 
     print(f"✓ Seasonal summary generated: {season_year}")
@@ -0,0 +1,194 @@
+"""
+Persistent loc_id → grid_id assignment
+eBird locations repeat heavily from month to month, so each location in the
+vocabulary (see vocab) is placed in its hexagon once and remembered in
+store/loc_grid_<grid hash>.parquet. Location ids are handed out in order,
+so the cache is an array indexed by loc_id: new locations are appended, and
+placing rows in cells is a single integer take, no string matching.
+
+The cache keeps the coordinates each location was placed from, so a
+location eBird has moved (see vocab) is placed again. The months holding
+it lose their derived files, which are rebuilt with the new cells, and
+the cache's placement revision goes up so pages and the count cube built
+from the old cells are redone too.
+"""
+
+import hashlib
+import os
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+import instrument
+from hexbin import GRID_FILE, OUTSIDE_GRID, HexLattice
+from observation_store import STORE_DIR, clear_derived, list_months, list_regions, partition_path
+from vocab import MISSING_ID, load_table
+
+
+def grid_digest(grid_file=GRID_FILE):
+    with open(grid_file, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()[:12]
+
+
+def cache_path(grid_file=GRID_FILE):
+    # Keyed by the grid's content, so editing grid.geojson starts a fresh cache
+    return STORE_DIR / f"loc_grid_{grid_digest(grid_file)}.parquet"
+
+
+def load_loc_grid(grid_file=GRID_FILE):
+    path = cache_path(grid_file)
+
+    # Caches keyed by locId strings or without coordinates are redone
+    if not path.exists() or "latitude" not in pq.read_schema(path).names:
+        return pd.DataFrame({
+            "loc_id": pd.Series(dtype="int32"),
+            "latitude": pd.Series(dtype="float32"),
+            "longitude": pd.Series(dtype="float32"),
+            "grid_id": pd.Series(dtype="int32")
+        })
+
+    return pd.read_parquet(path)
+
+
+def placement_revision(grid_file=GRID_FILE):
+    """
+    How many times cached locations have been moved to other cells.
+    """
+    path = cache_path(grid_file)
+
+    if not path.exists():
+        return 0
+
+    metadata = pq.read_schema(path).metadata or {}
+    return int(metadata.get(b"revision", 0))
+
+
+@lru_cache(maxsize=None)
+def load_lattice(grid_file=GRID_FILE):
+    return HexLattice.from_geojson(grid_file)
+
+
+def locate(locations, grid_file=GRID_FILE):
+    """
+    Place one point per location in its hexagon.
+    `locations` has loc_id, latitude, longitude; returns those and grid_id.
+    """
+    lattice = load_lattice(grid_file)
+
+    return pd.DataFrame({
+        "loc_id": locations["loc_id"].to_numpy(dtype=np.int32),
+        "latitude": locations["latitude"].to_numpy(dtype=np.float32),
+        "longitude": locations["longitude"].to_numpy(dtype=np.float32),
+        "grid_id": lattice.lookup(
+            locations["latitude"].to_numpy(), locations["longitude"].to_numpy()
+        )
+    })
+
+
+def update_loc_grid(grid_file=GRID_FILE):
+    """
+    Make sure every location in the vocabulary has a cached cell; only
+    locations added or moved since the last call are looked up. Returns
+    the full cache.
+    """
+    with instrument.stage("spatial_join"):
+        return _update_loc_grid(grid_file)
+
+
+def _update_loc_grid(grid_file):
+    loc_grid = load_loc_grid(grid_file)
+    locations = load_table("loc_id")
+
+    # Locations placed before whose coordinates have since been updated
+    coords = ["latitude", "longitude"]
+    placed = loc_grid[coords].to_numpy()
+    current = locations[coords].iloc[:len(loc_grid)].to_numpy()
+    moved = np.flatnonzero(((placed != current) & ~(np.isnan(placed) & np.isnan(current))).any(axis=1))
+
+    new = locations.iloc[len(loc_grid):]
+
+    if new.empty and not len(moved):
+        return loc_grid
+
+    relocated = locate(locations.iloc[moved], grid_file)
+    changed = moved[relocated["grid_id"].to_numpy() != loc_grid["grid_id"].to_numpy()[moved]]
+    for col in ["latitude", "longitude", "grid_id"]:
+        loc_grid.loc[moved, col] = relocated[col].to_numpy()
+
+    loc_grid = pd.concat([loc_grid, locate(new, grid_file)], ignore_index=True)
+
+    instrument.count(rows=len(new) + len(moved))
+
+    revision = placement_revision(grid_file) + (1 if len(changed) else 0)
+    _save_loc_grid(loc_grid, revision, grid_file)
+
+    print(f"✓ Assigned {len(new)} new locations to grid cells ({len(loc_grid)} cached)")
+
+    if len(changed):
+        cleared = clear_months_with(changed)
+        print(
+            f"⚠ {len(changed)} moved location(s) changed cells; cleared the derived "
+            f"files of {cleared} month(s) holding them"
+        )
+
+    return loc_grid
+
+
+def _save_loc_grid(loc_grid, revision, grid_file):
+    path = cache_path(grid_file)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    table = pa.Table.from_pandas(loc_grid, preserve_index=False)
+    table = table.replace_schema_metadata({**table.schema.metadata, b"revision": str(revision).encode()})
+
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    pq.write_table(table, tmp)
+    tmp.replace(path)
+
+
+def clear_months_with(loc_ids):
+    """
+    Delete the derived files of every stored month with rows at
+    `loc_ids`. Returns the number of months cleared.
+    """
+    cleared = 0
+
+    for region in list_regions():
+        for year, month in list_months(region):
+            path = partition_path(year, month, region)
+
+            if "loc_id" not in pq.read_schema(path).names:
+                continue
+
+            stored = pq.read_table(path, columns=["loc_id"])["loc_id"].to_numpy()
+            if np.isin(stored, loc_ids).any():
+                clear_derived(year, month, region)
+                cleared += 1
+
+    return cleared
+
+
+def assign_grid_ids(df, grid_file=GRID_FILE):
+    """
+    Return `df` (which has loc_id) with an int32 grid_id column (-1 where
+    outside the grid).
+    """
+    loc_grid = update_loc_grid(grid_file)
+
+    with instrument.stage("spatial_join"):
+        instrument.count(rows=len(df))
+        return _join_grid_ids(df, loc_grid)
+
+
+def _join_grid_ids(df, loc_grid):
+    # The extra slot catches MISSING_ID rows
+    lookup = np.append(loc_grid["grid_id"].to_numpy(dtype=np.int32), OUTSIDE_GRID)
+    loc_ids = df["loc_id"].to_numpy(dtype=np.int64)
+
+    df = df.copy()
+    df["grid_id"] = lookup[np.where(loc_ids == MISSING_ID, len(lookup) - 1, loc_ids)]
+
+    return df
@@ -0,0 +1,157 @@
+"""
+Analytic hexagon lookup
+grid.geojson is a regular flat-topped hexagon tessellation, so a point's cell
+follows from axial-coordinate arithmetic instead of a point-in-polygon test:
+
+    lattice = HexLattice.from_geojson("grid.geojson")
+    grid_ids = lattice.lookup(df.latitude.to_numpy(), df.longitude.to_numpy())
+
+Points outside every hexagon get -1. Run this file to check the result
+against gpd.sjoin for every stored month.
+"""
+
+import json
+from pathlib import Path
+
+import numpy as np
+
+
+GRID_FILE = Path("grid.geojson")
+
+OUTSIDE_GRID = -1
+
+SQRT3 = np.sqrt(3.0)
+
+
+def _cube_round(q, r):
+    """
+    Round fractional axial coordinates to the nearest hexagon.
+    """
+    s = -q - r
+
+    rq, rr, rs = np.rint(q), np.rint(r), np.rint(s)
+    dq, dr, ds = np.abs(rq - q), np.abs(rr - r), np.abs(rs - s)
+
+    fix_q = (dq > dr) & (dq > ds)
+    fix_r = ~fix_q & (dr > ds)
+
+    rq = np.where(fix_q, -rr - rs, rq)
+    rr = np.where(fix_r, -rq - rs, rr)
+
+    return rq.astype(np.int64), rr.astype(np.int64)
+
+
+class HexLattice:
+    """
+    Flat-topped hexagons of half-width `sx` and half-height `sy * sqrt(3) / 2`
+    (degrees), with one cell centred on (x0, y0). `table[q - q_min, r - r_min]`
+    holds the grid_id of axial cell (q, r), or -1.
+    """
+
+    def __init__(self, x0, y0, sx, sy, cells):
+        self.x0, self.y0 = x0, y0
+        self.sx, self.sy = sx, sy
+
+        centres = np.array([(x, y) for x, y, _ in cells])
+        q, r = self.axial(centres[:, 1], centres[:, 0])
+
+        self.q_min, self.r_min = q.min(), r.min()
+        self.table = np.full(
+            (q.max() - self.q_min + 1, r.max() - self.r_min + 1),
+            OUTSIDE_GRID,
+            dtype=np.int32
+        )
+        self.table[q - self.q_min, r - self.r_min] = [grid_id for _, _, grid_id in cells]
+
+    @classmethod
+    def from_geojson(cls, grid_file=GRID_FILE):
+        with open(grid_file, encoding="utf-8") as f:
+            features = json.load(f)["features"]
+
+        cells = []
+        widths, heights = [], []
+
+        for feature in features:
+            ring = np.asarray(feature["geometry"]["coordinates"][0][0])
+            xmin, ymin = ring.min(axis=0)
+            xmax, ymax = ring.max(axis=0)
+
+            cells.append(((xmin + xmax) / 2, (ymin + ymax) / 2, feature["properties"]["grid_id"]))
+            widths.append(xmax - xmin)
+            heights.append(ymax - ymin)
+
+        x0, y0, _ = cells[0]
+        sx = np.median(widths) / 2
+        sy = np.median(heights) / SQRT3
+
+        return cls(x0, y0, sx, sy, cells)
+
+    def axial(self, lat, lng):
+        u = (np.asarray(lng, dtype=np.float64) - self.x0) / self.sx
+        v = (np.asarray(lat, dtype=np.float64) - self.y0) / self.sy
+
+        q = 2.0 / 3.0 * u
+        r = -1.0 / 3.0 * u + SQRT3 / 3.0 * v
+
+        return _cube_round(q, r)
+
+    def lookup(self, lat, lng):
+        """
+        grid_id for each point as an int32 array, -1 outside the grid.
+        """
+        q, r = self.axial(lat, lng)
+        qi, ri = q - self.q_min, r - self.r_min
+
+        inside = (
+            (qi >= 0) & (qi < self.table.shape[0]) &
+            (ri >= 0) & (ri < self.table.shape[1])
+        )
+
+        grid_ids = np.full(qi.shape, OUTSIDE_GRID, dtype=np.int32)
+        grid_ids[inside] = self.table[qi[inside], ri[inside]]
+
+        return grid_ids
+
+
+# ---------------------------------------
+# VALIDATION
+# ---------------------------------------
+
+def validate_against_sjoin(grid_file=GRID_FILE):
+    """
+    Compare lookup() with gpd.sjoin(predicate="within") on every stored
+    observation. Returns the number of disagreeing rows.
+    """
+    import geopandas as gpd
+
+    from observation_store import list_months, read_month, period_name
+
+    lattice = HexLattice.from_geojson(grid_file)
+    grid = gpd.read_file(grid_file).to_crs("EPSG:4326")
+
+    total_mismatches = 0
+
+    for year, month in list_months():
+        df = read_month(year, month, columns=["latitude", "longitude"])
+
+        points = gpd.GeoDataFrame(
+            geometry=gpd.points_from_xy(df.longitude, df.latitude),
+            crs="EPSG:4326"
+        )
+        joined = gpd.sjoin(points, grid[["grid_id", "geometry"]], how="left", predicate="within")
+        joined = joined[~joined.index.duplicated(keep="first")]
+
+        expected = joined["grid_id"].fillna(OUTSIDE_GRID).astype(np.int32).to_numpy()
+        actual = lattice.lookup(df.latitude.to_numpy(), df.longitude.to_numpy())
+
+        mismatches = int((expected != actual).sum())
+        total_mismatches += mismatches
+
+        status = "✓" if mismatches == 0 else "⚠"
+        print(f"{status} {period_name(year, month)}: {len(df)} points, {mismatches} mismatches")
+
+    return total_mismatches
+
+
+if __name__ == "__main__":
+    validate_against_sjoin()
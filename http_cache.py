@@ -0,0 +1,143 @@
+"""
+On-disk cache for eBird /historic responses
+One gzipped JSON file per URL under .cache/ebird/, holding the records, the
+response ETag and when it was fetched. A day that was fetched after it had
+settled never changes, so it is served from disk forever; a recent day is
+reused for RECENT_TTL and then revalidated (If-None-Match) or refetched.
+The least recently used files are evicted once the cache passes its size cap.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+from datetime import datetime, timedelta
+from pathlib import Path
+
+
+# ---------------------------------------
+# CONFIG
+# ---------------------------------------
+
+CACHE_DIR = Path(os.getenv("EBIRD_CACHE_DIR", ".cache/ebird"))
+CACHE_ENABLED = os.getenv("EBIRD_CACHE", "1") != "0"
+CACHE_MAX_BYTES = int(float(os.getenv("EBIRD_CACHE_MAX_MB", "500")) * 1024 * 1024)
+
+# Same settling period as incremental_fetch.SETTLE_DAYS: a response fetched
+# this long after its date is final
+IMMUTABLE_AFTER_DAYS = 7
+
+RECENT_TTL = timedelta(hours=6)
+
+
+# ---------------------------------------
+# POLICY
+# ---------------------------------------
+
+def is_immutable(entry, day):
+    fetched = datetime.fromisoformat(entry["fetched_at"])
+    return fetched.date() >= day + timedelta(days=IMMUTABLE_AFTER_DAYS)
+
+
+def is_fresh(entry, day, now=None):
+    """
+    Whether a cached response for `day` can be used without asking the server.
+    """
+    if is_immutable(entry, day):
+        return True
+
+    now = now or datetime.utcnow()
+    return now - datetime.fromisoformat(entry["fetched_at"]) < RECENT_TTL
+
+
+# ---------------------------------------
+# CACHE
+# ---------------------------------------
+
+class ResponseCache:
+    """
+    URL → {"url", "etag", "fetched_at", "records"}, bounded to `max_bytes`
+    on disk. File modification times double as the LRU clock.
+    """
+
+    def __init__(self, root=CACHE_DIR, max_bytes=CACHE_MAX_BYTES):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.size = None
+
+    def path(self, url):
+        return self.root / f"{hashlib.sha256(url.encode('utf-8')).hexdigest()}.json.gz"
+
+    def get(self, url):
+        path = self.path(url)
+
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        os.utime(path)
+        return entry
+
+    def touch(self, url, entry):
+        """
+        The server confirmed the entry (304): restart its clock.
+        """
+        return self.put(url, entry["records"], entry.get("etag"))
+
+    def put(self, url, records, etag=None):
+        entry = {
+            "url": url,
+            "etag": etag,
+            "fetched_at": datetime.utcnow().isoformat(timespec="seconds"),
+            "records": records
+        }
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self.path(url)
+        old_size = path.stat().st_size if path.exists() else 0
+
+        # Write then rename so a reader never sees a partial file
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with gzip.open(tmp, "wt", encoding="utf-8") as f:
+            json.dump(entry, f)
+        tmp.replace(path)
+
+        self._grow(path.stat().st_size - old_size)
+
+        return entry
+
+    def _files(self):
+        return list(self.root.glob("*.json.gz"))
+
+    def _grow(self, delta):
+        if self.size is None:
+            self.size = sum(p.stat().st_size for p in self._files())
+        else:
+            self.size += delta
+
+        if self.size > self.max_bytes:
+            self.evict()
+
+    def evict(self):
+        """
+        Drop least recently used files until the cache is back under its cap.
+        """
+        files = sorted(self._files(), key=lambda p: p.stat().st_mtime)
+        self.size = sum(p.stat().st_size for p in files)
+
+        for path in files:
+            if self.size <= self.max_bytes:
+                break
+            self.size -= path.stat().st_size
+            path.unlink()
+
+    def clear(self):
+        for path in self._files():
+            path.unlink()
+        self.size = 0
+
+
+def default_cache():
+    return ResponseCache() if CACHE_ENABLED else None
@@ -0,0 +1,257 @@
+"""
+Manifest-driven month updates
+store/manifest.json records every (region, date) already stored and when it
+was fetched, so an update only requests the days that are missing (or too
+recent to be final) and merges them into the stored month partition.
+
+Days are staged in the partition as they arrive (see observation_store) and
+merged in with compact_month, which streams the stored rows and the staged
+days through one chunk at a time. Staging a day is a single file write;
+the vocabulary and the location → cell cache are brought up to date once
+per month, when it is merged.
+"""
+
+import json
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import pyarrow.parquet as pq
+
+import instrument
+from fetch_engine import day_frame, fetch_days, month_dates
+from grid_index import update_loc_grid
+from observation_store import (
+    STORE_DIR, clear_staging, has_month, iter_month_chunks, partition_path,
+    period_name, read_staged_day, stage_day, staged_days, write_month_chunks
+)
+from schema import OBSERVATION_SCHEMA
+
+
+MANIFEST_PATH = STORE_DIR / "manifest.json"
+
+# Checklists keep arriving for a while after the fact; a day fetched sooner
+# than this is refetched on the next incremental run.
+SETTLE_DAYS = 7
+
+DEDUP_KEYS = ["subId", "speciesCode"]
+
+
+# ---------------------------------------
+# MANIFEST
+# ---------------------------------------
+
+def load_manifest(path=MANIFEST_PATH):
+    path = Path(path)
+    if not path.exists():
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_manifest(manifest, path=MANIFEST_PATH):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    tmp = path.with_suffix(".json.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    tmp.replace(path)
+
+
+def mark_days(manifest, region, counts):
+    """
+    `counts` is {date: number of records, or None if the day failed}.
+    """
+    fetched_at = datetime.utcnow().isoformat(timespec="seconds")
+    entries = manifest.setdefault(region, {})
+
+    for day, records in counts.items():
+        if records is not None:
+            entries[day.isoformat()] = {
+                "fetched_at": fetched_at,
+                "records": records
+            }
+
+
+def seed_month(manifest, region, days):
+    """
+    Months stored before the manifest existed were always complete
+    fetches, so record their days with an unknown fetch time.
+    """
+    entries = manifest.setdefault(region, {})
+    for day in days:
+        entries.setdefault(day.isoformat(), {"fetched_at": None, "records": None})
+
+
+def is_settled(entry, day, today=None):
+    today = today or date.today()
+    settled_by = day + timedelta(days=SETTLE_DAYS)
+
+    if entry.get("fetched_at") is None:
+        return settled_by <= today
+
+    return date.fromisoformat(entry["fetched_at"][:10]) >= settled_by
+
+
+def missing_days(manifest, region, days, today=None):
+    entries = manifest.get(region, {})
+    return [
+        day for day in days
+        if day.isoformat() not in entries
+        or not is_settled(entries[day.isoformat()], day, today)
+    ]
+
+
+# ---------------------------------------
+# MERGING
+# ---------------------------------------
+
+def observation_keys(df):
+    return df["subId"].astype(str) + "|" + df["speciesCode"].astype(str)
+
+
+def compact_month(region, year, month, incremental=True):
+    """
+    Fold the month's staged days into its partition, keeping the newest copy
+    of any observation (same checklist + species) seen twice. Stored rows
+    come first, then each day in date order, exactly as if everything had
+    been concatenated and de-duplicated, but only one chunk and the
+    observation keys are ever in memory. Returns (rows written, rows staged).
+    """
+    parts = list(staged_days(year, month, region).values())
+
+    # later_keys[i]: keys that a later day will supply again
+    later_keys = []
+    seen = set()
+    for path in reversed(parts):
+        later_keys.append(frozenset(seen))
+        seen |= set(observation_keys(read_staged_day(path, DEDUP_KEYS)))
+    later_keys.reverse()
+
+    staged_rows = 0
+
+    def chunks():
+        nonlocal staged_rows
+
+        if incremental:
+            # Stored columns plus the key: rows pass through with their ids as they are
+            columns = OBSERVATION_SCHEMA.names + ["speciesCode"]
+            for chunk in iter_month_chunks(year, month, region, columns=columns):
+                yield chunk[~observation_keys(chunk).isin(seen)]
+
+        for path, later in zip(parts, later_keys):
+            day = read_staged_day(path)
+            staged_rows += len(day)
+
+            day = day[~day.duplicated(DEDUP_KEYS, keep="last")]
+            yield day[~observation_keys(day).isin(later)]
+
+    return write_month_chunks(chunks(), year, month, region), staged_rows
+
+
+# ---------------------------------------
+# UPDATE
+# ---------------------------------------
+
+def month_days(year, month, today=None):
+    today = today or date.today()
+    return [day for day in month_dates(year, month) if day <= today]
+
+
+def days_to_fetch(manifest, region, year, month, incremental=True, today=None):
+    """
+    The days of a month that need (re)fetching: all of them unless
+    incremental, otherwise only the missing or unsettled ones.
+    """
+    today = today or date.today()
+    days = month_days(year, month, today)
+
+    if not incremental:
+        return days
+
+    if has_month(year, month, region) and not any(
+        day.isoformat() in manifest.get(region, {}) for day in days
+    ):
+        seed_month(manifest, region, days)
+
+    return missing_days(manifest, region, days, today)
+
+
+def resumable_days(region, year, month, days):
+    """
+    {date: records} for days staged by an earlier, interrupted run,
+    which don't need fetching again.
+    """
+    return {
+        day: pq.ParquetFile(path).metadata.num_rows
+        for day, path in staged_days(year, month, region).items() if day in days
+    }
+
+
+def stage_records(region, day, records):
+    with instrument.stage("parse", period_name(day.year, day.month)):
+        df = day_frame(records)
+        instrument.count(rows=len(df))
+
+    stage_day(df, day, region)
+
+
+def finish_month(manifest, region, year, month, counts, incremental=True):
+    """
+    Merge the month's staged days into its partition and record `counts`
+    ({date: records}) in the manifest. Returns the rows written.
+    """
+    rows, fetched = compact_month(region, year, month, incremental)
+
+    if not rows:
+        print("No data found.")
+    else:
+        print(f"Saved: {partition_path(year, month, region)} ({rows} rows, {fetched} fetched)")
+
+        # Place the month's new locations now so map builds never need a spatial join
+        update_loc_grid()
+
+    mark_days(manifest, region, counts)
+    save_manifest(manifest)
+    clear_staging(year, month, region)
+
+    return rows
+
+
+def update_month(region, year, month, api_key, incremental=True, **fetch_kwargs):
+    """
+    Bring the stored (region, year, month) partition up to date.
+    With incremental=False every day is refetched and the partition replaced.
+    Returns the fetch stats (stats["failed"] > 0 means nothing was saved).
+    """
+    time_period = period_name(year, month)
+
+    manifest = load_manifest()
+
+    to_fetch = days_to_fetch(manifest, region, year, month, incremental)
+
+    if not to_fetch:
+        print(f"✓ {time_period} up to date ({len(month_days(year, month))} days stored)")
+        return {"days": 0, "failed": 0, "failed_days": [], "requests": 0}
+
+    print(f"Fetching {len(to_fetch)}/{len(month_days(year, month))} days for {time_period}")
+
+    resumed = resumable_days(region, year, month, to_fetch)
+    if resumed:
+        print(f"Resuming: {len(resumed)}/{len(to_fetch)} days already staged")
+
+    with instrument.stage("fetch", time_period):
+        counts, stats = fetch_days(
+            region, [day for day in to_fetch if day not in resumed], api_key,
+            on_day=lambda day, records: stage_records(region, day, records),
+            **fetch_kwargs
+        )
+
+    # Never save a month with holes in it; completed days stay staged
+    if stats["failed"]:
+        return stats
+
+    counts.update(resumed)
+    finish_month(manifest, region, year, month, counts, incremental)
+
+    return stats
@@ -0,0 +1,214 @@
+"""
+Pipeline instrumentation
+Each pipeline stage runs inside a named, timed block and adds to its counters:
+
+    with instrument.run("produce_seasons"):
+        ...
+        with instrument.stage("render", "Winter_2025"):
+            ...
+            instrument.count(bytes_written=len(data))
+
+Stages are fetch, parse, spatial_join, aggregate, store_write and render.
+Every (stage, period) pair gets one record: calls, wall time (including any
+stages nested inside it), rows, bytes read and written, HTTP requests,
+retries and cache hits, and the process's peak RSS when the stage last
+ended. A stage opened without a period takes its enclosing stage's period.
+
+When the run ends, instrument.run writes a JSON report to
+reports/<script>_<UTC time>.json, so runs can be compared as data grows.
+Stages recorded in worker processes come back with each task's result and
+are merged in (see parallel_render).
+"""
+
+import json
+import os
+import platform
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+
+REPORT_DIR = Path(os.getenv("INSTRUMENT_DIR", "reports"))
+
+COUNTERS = ["rows", "bytes_read", "bytes_written", "requests", "retries", "cache_hits"]
+
+_records = {}
+_active = []
+
+
+# ---------------------------------------
+# MEMORY
+# ---------------------------------------
+
+def peak_rss_mb():
+    """
+    The process's peak resident memory so far, or None where unsupported.
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # Linux reports KiB, macOS bytes
+    return round(peak / (1024 ** 2 if sys.platform == "darwin" else 1024), 1)
+
+
+# ---------------------------------------
+# STAGES
+# ---------------------------------------
+
+def _record(name, period):
+    key = (name, period)
+
+    if key not in _records:
+        _records[key] = {
+            "stage": name,
+            "period": period,
+            "calls": 0,
+            "seconds": 0.0,
+            **{counter: 0 for counter in COUNTERS},
+            "peak_rss_mb": None
+        }
+
+    return _records[key]
+
+
+@contextmanager
+def stage(name, period=None):
+    if period is None and _active:
+        period = _active[-1]["period"]
+
+    record = _record(name, period)
+    _active.append(record)
+    start = time.perf_counter()
+
+    try:
+        yield record
+    finally:
+        _active.pop()
+        record["calls"] += 1
+        record["seconds"] += time.perf_counter() - start
+        record["peak_rss_mb"] = peak_rss_mb()
+
+
+def count(**counters):
+    """
+    Add to the innermost open stage's counters; does nothing outside a stage.
+    """
+    if not _active:
+        return
+
+    for counter, value in counters.items():
+        _active[-1][counter] += value
+
+
+def records():
+    return [dict(record) for record in _records.values()]
+
+
+def merge(stage_records):
+    """
+    Fold records from another process into this one's.
+    """
+    for other in stage_records:
+        record = _record(other["stage"], other["period"])
+
+        record["calls"] += other["calls"]
+        record["seconds"] += other["seconds"]
+        for counter in COUNTERS:
+            record[counter] += other[counter]
+
+        peaks = [p for p in (record["peak_rss_mb"], other["peak_rss_mb"]) if p is not None]
+        record["peak_rss_mb"] = max(peaks) if peaks else None
+
+
+@contextmanager
+def isolated():
+    """
+    Record into a fresh set of stages (e.g. one render task) and hand them
+    back in the yielded list on exit, leaving the outer records untouched.
+    """
+    global _records, _active
+
+    saved = _records, _active
+    _records, _active = {}, []
+    collected = []
+
+    try:
+        yield collected
+    finally:
+        collected.extend(records())
+        _records, _active = saved
+
+
+# ---------------------------------------
+# REPORT
+# ---------------------------------------
+
+def totals(stage_records):
+    """
+    Per-stage sums across periods.
+    """
+    summed = {}
+
+    for record in stage_records:
+        total = summed.setdefault(record["stage"], {"calls": 0, "seconds": 0.0, **{c: 0 for c in COUNTERS}})
+        total["calls"] += record["calls"]
+        total["seconds"] += record["seconds"]
+        for counter in COUNTERS:
+            total[counter] += record[counter]
+
+    for total in summed.values():
+        total["seconds"] = round(total["seconds"], 4)
+
+    return summed
+
+
+def write_report(script, started_at, seconds, report_dir=REPORT_DIR):
+    stage_records = records()
+
+    for record in stage_records:
+        record["seconds"] = round(record["seconds"], 4)
+
+    report = {
+        "script": script,
+        "started_at": started_at.isoformat(timespec="seconds"),
+        "seconds": round(seconds, 3),
+        "peak_rss_mb": peak_rss_mb(),
+        "python": platform.python_version(),
+        "stages": stage_records,
+        "totals": totals(stage_records)
+    }
+
+    report_dir = Path(report_dir)
+    report_dir.mkdir(parents=True, exist_ok=True)
+
+    path = report_dir / f"{script}_{started_at:%Y%m%dT%H%M%SZ}.json"
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=1)
+
+    print(f"📊 Run report: {path} ({seconds:.1f}s, peak {report['peak_rss_mb']} MB)")
+
+    return path
+
+
+@contextmanager
+def run(script):
+    """
+    Instrument a whole script run and write its report at the end, even if
+    the run fails part way.
+    """
+    _records.clear()
+    _active.clear()
+
+    started_at = datetime.now(timezone.utc)
+    start = time.perf_counter()
+
+    try:
+        yield
+    finally:
+        write_report(script, started_at, time.perf_counter() - start)
@@ -0,0 +1,128 @@
+"""
+Local stand-in for the eBird /historic endpoint
+Serves synthetic observations so the fetch path can be exercised offline:
+
+    server, base_url = start_server()
+    fetch_days("IN-MH", month_dates(2025, 1), "test", base_url=base_url)
+    server.shutdown()
+"""
+
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+HISTORIC_PATH = re.compile(r"^/(?P<region>[^/]+)/historic/(?P<y>\d{4})/(?P<m>\d{2})/(?P<d>\d{2})$")
+
+SPECIES = [
+    ("comior1", "Common Myna", "Acridotheres tristis"),
+    ("rewlap1", "Red-wattled Lapwing", "Vanellus indicus"),
+    ("rvbul", "Red-vented Bulbul", "Pycnonotus cafer"),
+    ("blakit1", "Black Kite", "Milvus migrans"),
+    ("junbab2", "Jungle Babbler", "Argya striata"),
+]
+
+
+def synthetic_day(region, day_str, n_records, seed=None):
+    rng = random.Random(seed if seed is not None else f"{region}{day_str}")
+    records = []
+
+    for i in range(n_records):
+        # Five distinct species per checklist, like a real historic response
+        code, common, sci = SPECIES[i % len(SPECIES)]
+        loc = rng.randint(1, 200)
+        # A location's coordinates are fixed, as in eBird
+        place = random.Random(f"L{loc}")
+        records.append({
+            "speciesCode": code,
+            "comName": common,
+            "sciName": sci,
+            "locId": f"L{loc}",
+            "locName": f"Location {loc}",
+            "obsDt": f"{day_str.replace('/', '-')} 07:00",
+            "howMany": rng.randint(1, 10),
+            "lat": place.uniform(16.0, 21.5),
+            "lng": place.uniform(73.0, 80.5),
+            "obsValid": True,
+            "obsReviewed": False,
+            "locationPrivate": False,
+            "subId": f"S{day_str.replace('/', '')}{i // 5:04d}",
+        })
+
+    return records
+
+
+def make_handler(records_per_day=50, latency=0.0, error_rate=0.0):
+
+    class Handler(BaseHTTPRequestHandler):
+
+        def do_GET(self):
+            match = HISTORIC_PATH.match(self.path)
+
+            if not match:
+                self.send_response(404)
+                self.end_headers()
+                return
+
+            time.sleep(latency)
+
+            # Simulate throttling so retry/backoff paths get exercised
+            if random.random() < error_rate:
+                self.send_response(429)
+                self.send_header("Retry-After", "0.1")
+                self.end_headers()
+                return
+
+            day_str = f"{match['y']}/{match['m']}/{match['d']}"
+            body = json.dumps(
+                synthetic_day(match["region"], day_str, records_per_day)
+            ).encode("utf-8")
+            etag = f'"{hashlib.sha1(body).hexdigest()}"'
+
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+
+            self.send_response(200)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def start_server(port=0, records_per_day=50, latency=0.0, error_rate=0.0):
+    """
+    Run the stand-in server on a background thread.
+    Returns (server, base_url); call server.shutdown() when done.
+    """
+    server = ThreadingHTTPServer(
+        ("127.0.0.1", port),
+        make_handler(records_per_day, latency, error_rate)
+    )
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    return server, base_url
+
+
+if __name__ == "__main__":
+    server, base_url = start_server(port=8765)
+    print(f"Mock eBird API at {base_url} (Ctrl+C to stop)")
+
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,214 @@
+"""
+Mergeable per-month aggregates
+Each month partition gets a small sketch next to its observations:
+
+    store/region=IN-MH/year=2025/month=01/aggregates_v<version>_<grid hash>.parquet
+
+one row per (grid_id, species_id) with the number of rows and the position
+of the first one. That is enough to rebuild a month's or a season's cell
+totals, top species and species richness exactly, so a season is a merge of
+3-5 small sketches instead of a rescan of raw observations. Names are only
+looked up (see vocab) for the species a page shows.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+import instrument
+from grid_index import OUTSIDE_GRID, assign_grid_ids, grid_digest
+from hexbin import GRID_FILE
+from observation_store import (
+    REGION_CODE, has_month, iter_month_chunks, partition_dir, period_name
+)
+from vocab import decode
+
+
+SKETCH_PREFIX = "aggregates_"
+
+# Bump when build_sketch's output changes, so stored sketches are rebuilt
+SKETCH_VERSION = 2
+
+SKETCH_KEYS = ["grid_id", "species_id"]
+
+
+# ---------------------------------------
+# BUILD / STORE
+# ---------------------------------------
+
+def sketch_path(year, month, region=REGION_CODE, grid_file=GRID_FILE):
+    # Cells depend on the grid, so the sketch is keyed by it too
+    return partition_dir(year, month, region) / (
+        f"{SKETCH_PREFIX}v{SKETCH_VERSION}_{grid_digest(grid_file)}.parquet"
+    )
+
+
+def build_sketch(df, grid_file=GRID_FILE):
+    """
+    Collapse raw observations into (grid_id, species_id, count, first).
+    `first` is the row position of the group's first row.
+    """
+    joined = assign_grid_ids(df, grid_file)
+    joined = joined[SKETCH_KEYS].assign(order=np.arange(len(joined)))
+
+    sketch = (
+        joined.groupby(SKETCH_KEYS, sort=False)["order"]
+        .agg(count="size", first="min")
+        .reset_index()
+    )
+
+    return sketch.astype({"grid_id": "int32", "species_id": "int32", "count": "int64", "first": "int64"})
+
+
+def month_sketch(year, month, region=REGION_CODE, grid_file=GRID_FILE):
+    """
+    The month's sketch, built and saved on first use. None if the month
+    isn't stored. (write_month deletes sketches, so they never go stale.)
+    """
+    path = sketch_path(year, month, region, grid_file)
+
+    if path.exists():
+        instrument.count(bytes_read=path.stat().st_size)
+        return pd.read_parquet(path)
+
+    if not has_month(year, month, region):
+        return None
+
+    with instrument.stage("aggregate", period_name(year, month)):
+        return _build_month_sketch(path, year, month, region, grid_file)
+
+
+def _build_month_sketch(path, year, month, region, grid_file):
+    columns = ["loc_id", "species_id"]
+
+    # One sketch per chunk, merged like months, so only a chunk of raw rows
+    # is ever in memory
+    chunks = iter_month_chunks(year, month, region, columns=columns)
+    sketch = merge_sketches(build_sketch(chunk, grid_file) for chunk in chunks)
+
+    if sketch is None:
+        sketch = build_sketch(pd.DataFrame({col: pd.Series(dtype="int32") for col in columns}), grid_file)
+
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    sketch.to_parquet(tmp, index=False)
+    tmp.replace(path)
+
+    instrument.count(bytes_written=path.stat().st_size)
+
+    return sketch
+
+
+def merge_sketches(sketches):
+    """
+    Combine month sketches in chronological order. Row positions are
+    shifted by the rows of earlier months, so `first` still orders
+    sightings across the whole period.
+    """
+    parts = []
+    offset = 0
+
+    for sketch in sketches:
+        if sketch is None or sketch.empty:
+            continue
+        parts.append(sketch.assign(first=sketch["first"] + offset))
+        offset += int(sketch["count"].sum())
+
+    if not parts:
+        return None
+
+    merged = pd.concat(parts, ignore_index=True)
+
+    return (
+        merged.groupby(SKETCH_KEYS, sort=False)
+        .agg(count=("count", "sum"), first=("first", "min"))
+        .reset_index()
+    )
+
+
+def period_sketch(months, region=REGION_CODE, grid_file=GRID_FILE):
+    return merge_sketches(month_sketch(y, m, region, grid_file) for y, m in months)
+
+
+# ---------------------------------------
+# RANKING
+# ---------------------------------------
+
+def top_species_lists(counts, keys, top_n):
+    """
+    `counts` has the key columns plus commonName, count and first.
+    Returns {key tuple: [names, most counted first, ties by first sighting]}.
+    """
+    ranked = counts.sort_values(
+        keys + ["count", "first"],
+        ascending=[True] * len(keys) + [False, True]
+    )
+    top = ranked[ranked.groupby(keys, observed=True).cumcount() < top_n]
+
+    if top.empty:
+        return {}
+
+    # Split the ranked names into one list per group without a per-group loop
+    key_values = top[keys].to_numpy()
+    starts = np.flatnonzero(np.r_[True, (key_values[1:] != key_values[:-1]).any(axis=1)])
+    bounds = list(starts[1:]) + [len(top)]
+    names = top["commonName"].astype(str).to_numpy().tolist()
+
+    return {
+        tuple(key_values[a].tolist()): names[a:b] for a, b in zip(starts, bounds)
+    }
+
+
+def cells_from_sketch(sketch, top_n=5):
+    """
+    Same result as aggregate_cells (see benchmarks/bench_aggregate.py) on
+    the raw rows.
+    """
+    columns = ["grid_id", "observations", "top_species"]
+
+    in_grid = sketch[sketch["grid_id"] != OUTSIDE_GRID] if sketch is not None else None
+
+    if in_grid is None or in_grid.empty:
+        return pd.DataFrame(columns=columns)
+
+    cells = in_grid.groupby("grid_id")["count"].sum().reset_index(name="observations")
+
+    named = (
+        decode(in_grid, ["commonName"])
+        .dropna(subset=["commonName"])
+        .groupby(["grid_id", "commonName"], observed=True, sort=False)
+        .agg(count=("count", "sum"), first=("first", "min"))
+        .reset_index()
+    )
+    top_lists = top_species_lists(named, ["grid_id"], top_n)
+
+    cells["top_species"] = [top_lists.get((g,), []) for g in cells["grid_id"].tolist()]
+
+    return cells[columns]
+
+
+def summary_from_sketch(sketch, top_n=3):
+    """
+    (total observations, species richness, top species as Name/Count)
+    matching len(df), df.scientificName.nunique() and value_counts().head().
+    """
+    sketch = decode(sketch, ["commonName", "scientificName"])
+
+    total_observations = int(sketch["count"].sum())
+    species_richness = int(sketch["scientificName"].dropna().nunique())
+
+    named = (
+        sketch.dropna(subset=["commonName"])
+        .groupby("commonName", observed=True, sort=False)
+        .agg(count=("count", "sum"), first=("first", "min"))
+        .reset_index()
+        .sort_values(["count", "first"], ascending=[False, True])
+        .head(top_n)
+    )
+
+    top = pd.DataFrame({
+        "Name": named["commonName"].astype(str).to_numpy(),
+        "Count": named["count"].to_numpy()
+    })
+
+    return total_observations, species_richness, top
@@ -0,0 +1,355 @@
+"""
+Partitioned Parquet observation store
+One file per region/year/month:
+
+    store/region=IN-MH/year=2025/month=01/observations.parquet
+
+Every fetcher writes here and every generator reads through read_month /
+read_months, so seasons are just a list of month partitions (see
+seasons_data.read_season) instead of copied CSVs. Column types come from
+schema.py.
+
+Fetches stream into the store: each day is staged, as fetched, in its own
+small file under the partition's _staging/ folder as soon as it arrives,
+and write_month_chunks folds them in one chunk at a time. iter_month_chunks
+reads a month back the same way, so memory follows the chunk size rather
+than the number of months.
+
+Species and location columns are stored as species_id / loc_id (see
+vocab). Readers get the columns they ask for either way: ask for
+commonName or latitude and they are looked up from the ids, ask for the
+ids and no strings are touched.
+"""
+
+import calendar
+from datetime import date, datetime
+from pathlib import Path
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+import instrument
+from schema import (
+    FETCHED_SCHEMA, OBSERVATION_SCHEMA, apply_dtypes, iter_parquet, read_csv, read_parquet, to_arrow
+)
+
+
+STORE_DIR = Path("store")
+REGION_CODE = "IN-MH"
+
+PARTITION_FILE = "observations.parquet"
+
+STAGING_DIR = "_staging"
+
+# Rows per chunk when streaming a month in or out
+CHUNK_ROWS = 100_000
+
+
+# ---------------------------------------
+# PARTITIONS
+# ---------------------------------------
+
+def partition_dir(year, month, region=REGION_CODE, root=STORE_DIR):
+    return Path(root) / f"region={region}" / f"year={year}" / f"month={month:02d}"
+
+
+def partition_path(year, month, region=REGION_CODE, root=STORE_DIR):
+    return partition_dir(year, month, region, root) / PARTITION_FILE
+
+
+def has_month(year, month, region=REGION_CODE, root=STORE_DIR):
+    return partition_path(year, month, region, root).exists()
+
+
+def list_regions(root=STORE_DIR):
+    return sorted(path.name.split("=", 1)[1] for path in Path(root).glob("region=*") if path.is_dir())
+
+
+def list_months(region=REGION_CODE, root=STORE_DIR):
+    """
+    Sorted [(year, month), ...] of every stored month for `region`.
+    """
+    months = []
+
+    for path in (Path(root) / f"region={region}").glob(f"year=*/month=*/{PARTITION_FILE}"):
+        year = int(path.parent.parent.name.split("=")[1])
+        month = int(path.parent.name.split("=")[1])
+        months.append((year, month))
+
+    return sorted(months)
+
+
+def parse_period(time_period):
+    """
+    'January_2025' → (2025, 1)
+    """
+    month_str, year_str = time_period.split("_")
+    return int(year_str), datetime.strptime(month_str, "%B").month
+
+
+def period_name(year, month):
+    return f"{calendar.month_name[month]}_{year}"
+
+
+# ---------------------------------------
+# VOCABULARY
+# ---------------------------------------
+# vocab keeps its tables in the store, so it imports this module and is
+# imported here only when rows are encoded or decoded.
+
+def _encode(df, root):
+    from vocab import encode
+
+    return encode(df, root)
+
+
+def _vocab_writes():
+    from vocab import deferred_writes
+
+    return deferred_writes()
+
+
+def _stored_columns(columns):
+    """
+    The stored columns needed to give back `columns`.
+    """
+    if columns is None:
+        return None
+
+    from vocab import TABLES
+
+    stored = [col for col in columns if col in OBSERVATION_SCHEMA.names]
+
+    for id_column, (_, table_columns) in TABLES.items():
+        if id_column not in stored and any(col in table_columns for col in columns):
+            stored.append(id_column)
+
+    return stored
+
+
+def _decode(df, columns, root):
+    """
+    Stored rows → `columns` (every column, ids included, if None).
+    """
+    from vocab import decode
+
+    df = decode(df, columns, root)
+
+    return df if columns is None else df[list(columns)]
+
+
+def _check_encoded(path):
+    from vocab import is_encoded
+
+    if not is_encoded(path):
+        raise RuntimeError(f"{path} predates the species/location vocabulary; run python vocab.py")
+
+
+# ---------------------------------------
+# READ / WRITE
+# ---------------------------------------
+
+def write_month_chunks(chunks, year, month, region=REGION_CODE, root=STORE_DIR):
+    """
+    Replace a month partition with the DataFrames yielded by `chunks`,
+    holding only one chunk in memory at a time. Nothing is written if the
+    chunks hold no rows. Returns the number of rows written.
+    """
+    path = partition_path(year, month, region, root)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    tmp = path.with_suffix(".parquet.tmp")
+    rows = 0
+
+    with instrument.stage("store_write", period_name(year, month)):
+        # New species and locations are written once for the whole month,
+        # before the partition that refers to them replaces the old one
+        with _vocab_writes(), pq.ParquetWriter(tmp, OBSERVATION_SCHEMA) as writer:
+            for chunk in chunks:
+                if len(chunk):
+                    writer.write_table(to_arrow(_encode(chunk, root)))
+                    rows += len(chunk)
+
+        if not rows:
+            tmp.unlink()
+            return 0
+
+        instrument.count(rows=rows, bytes_written=tmp.stat().st_size)
+        tmp.replace(path)
+
+    # Anything else in the partition was derived from the old observations
+    clear_derived(year, month, region, root)
+
+    return rows
+
+
+def clear_derived(year, month, region=REGION_CODE, root=STORE_DIR):
+    """
+    Delete the files derived from a month (aggregates, checklist
+    matrices); they are rebuilt on next use.
+    """
+    for derived in partition_dir(year, month, region, root).iterdir():
+        if derived.is_file() and derived.name != PARTITION_FILE:
+            derived.unlink()
+
+
+def write_month(df, year, month, region=REGION_CODE, root=STORE_DIR):
+    write_month_chunks([df], year, month, region, root)
+    return partition_path(year, month, region, root)
+
+
+def read_month(year, month, region=REGION_CODE, columns=None, root=STORE_DIR):
+    """
+    One month as a DataFrame, or None if it hasn't been stored.
+    """
+    path = partition_path(year, month, region, root)
+
+    if not path.exists():
+        return None
+
+    _check_encoded(path)
+
+    df = _decode(read_parquet(path, _stored_columns(columns)), columns, root)
+    instrument.count(rows=len(df), bytes_read=path.stat().st_size)
+
+    return df
+
+
+def iter_month_chunks(year, month, region=REGION_CODE, columns=None,
+                      root=STORE_DIR, chunk_rows=CHUNK_ROWS):
+    """
+    Yield one month as DataFrames of at most `chunk_rows` rows, in stored
+    order. Yields nothing if the month hasn't been stored.
+    """
+    path = partition_path(year, month, region, root)
+
+    if not path.exists():
+        return
+
+    _check_encoded(path)
+    instrument.count(bytes_read=path.stat().st_size)
+
+    for chunk in iter_parquet(path, _stored_columns(columns), chunk_rows):
+        instrument.count(rows=len(chunk))
+        yield _decode(chunk, columns, root)
+
+
+def iter_months_chunks(months, region=REGION_CODE, columns=None,
+                       root=STORE_DIR, chunk_rows=CHUNK_ROWS):
+    for year, month in months:
+        yield from iter_month_chunks(year, month, region, columns, root, chunk_rows)
+
+
+def read_months(months, region=REGION_CODE, columns=None, root=STORE_DIR,
+                partition_columns=False):
+    """
+    Concatenate several (year, month) partitions; missing ones are skipped.
+    Returns None if none of them exist. With partition_columns=True each
+    row is tagged with the year and month it came from.
+    """
+    dfs = []
+
+    for year, month in months:
+        df = read_month(year, month, region, columns, root)
+
+        if df is None:
+            continue
+
+        if partition_columns:
+            df = df.assign(year=year, month=month)
+
+        dfs.append(df)
+
+    if not dfs:
+        return None
+
+    # Categories differ per month, so union them rather than fall back to object
+    combined = pd.concat(dfs, ignore_index=True)
+    return apply_dtypes(combined)
+
+
+# ---------------------------------------
+# STAGING
+# ---------------------------------------
+# One file per fetched day, written the moment the day arrives. A crashed
+# or partly failed run leaves them in place, so the next run only fetches
+# the days that are missing. Days are staged as fetched and only encoded
+# when their month is written, so staging never touches the vocabulary.
+
+def staging_dir(year, month, region=REGION_CODE, root=STORE_DIR):
+    return partition_dir(year, month, region, root) / STAGING_DIR
+
+
+def stage_day(df, day, region=REGION_CODE, root=STORE_DIR):
+    folder = staging_dir(day.year, day.month, region, root)
+    folder.mkdir(parents=True, exist_ok=True)
+
+    path = folder / f"{day.isoformat()}.parquet"
+
+    with instrument.stage("store_write", period_name(day.year, day.month)):
+        # Write then rename so a crash never leaves a half-written day behind
+        tmp = path.with_suffix(".parquet.tmp")
+        pq.write_table(to_arrow(df, FETCHED_SCHEMA), tmp)
+        tmp.replace(path)
+
+        instrument.count(rows=len(df), bytes_written=path.stat().st_size)
+
+    return path
+
+
+def staged_days(year, month, region=REGION_CODE, root=STORE_DIR):
+    """
+    {date: path} of the days staged for a month.
+    """
+    folder = staging_dir(year, month, region, root)
+
+    return {
+        date.fromisoformat(path.stem): path
+        for path in sorted(folder.glob("*.parquet"))
+    }
+
+
+def read_staged_day(path, columns=None, root=STORE_DIR):
+    """
+    A staged day with the fetched `columns` (all of them if None). Days
+    staged with ids instead of names are looked up on the way out.
+    """
+    from vocab import is_encoded
+
+    if not is_encoded(path):
+        return read_parquet(path, columns)
+
+    return _decode(read_parquet(path, _stored_columns(columns)), columns, root)
+
+
+def clear_staging(year, month, region=REGION_CODE, root=STORE_DIR):
+    folder = staging_dir(year, month, region, root)
+
+    for path in folder.glob("*"):
+        path.unlink()
+
+    if folder.exists():
+        folder.rmdir()
+
+
+# ---------------------------------------
+# MIGRATION
+# ---------------------------------------
+
+def import_csvs(months_dir=Path("months"), region=REGION_CODE, root=STORE_DIR):
+    """
+    Load legacy months/<Month>_<Year>.csv files into the store.
+    """
+    imported = []
+
+    for csv_file in sorted(Path(months_dir).glob("*.csv")):
+        year, month = parse_period(csv_file.stem)
+        write_month(read_csv(csv_file), year, month, region, root)
+        imported.append((year, month))
+        print(f"✓ Imported {csv_file} → {partition_path(year, month, region, root)}")
+
+    return imported
+
+
+if __name__ == "__main__":
+    import_csvs()
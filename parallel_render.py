@@ -0,0 +1,172 @@
+"""
+Parallel rendering of maps and summaries
+Periods are independent, so each (generator, period) pair runs as its own
+task in a process pool:
+
+    render_tasks([("map", "January_2025", "monthly"), ("summary", "January_2025")])
+
+Run as a script to render one month's map and summary (the monthly
+workflow's render step):
+
+    python parallel_render.py January_2025
+
+Every task writes only its own files, so the output is identical to running
+the same calls one after another. RENDER_WORKERS (or workers=) sets the pool
+size; workers=1 runs everything in-process. Tasks whose inputs are unchanged
+since the last build (see build_cache) are skipped unless force=True. A
+failed task doesn't stop the others; scripts pass the results to
+check_results once everything has rendered, so the run still fails.
+"""
+
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+
+import build_cache
+import instrument
+from checklist_matrix import month_matrix
+from generate_map import generate_map, write_web_grid
+from generate_summary import generate_summary
+from generate_summary_seasonal import generate_seasonal_summary
+from grid_index import update_loc_grid
+from month_aggregates import month_sketch
+from species_assets import load_index
+
+
+RENDER_WORKERS = int(os.getenv("RENDER_WORKERS", str(os.cpu_count() or 1)))
+
+RENDERERS = {
+    "map": generate_map,
+    "summary": generate_summary,
+    "seasonal_summary": generate_seasonal_summary
+}
+
+
+def _run_task(task):
+    kind, *args = task
+
+    start = time.perf_counter()
+
+    # Stages go back with the result, since workers don't share records
+    with instrument.isolated() as stages:
+        try:
+            RENDERERS[kind](*args)
+            error = None
+        except Exception:
+            error = traceback.format_exc()
+
+    return {
+        "task": task,
+        "seconds": time.perf_counter() - start,
+        "error": error,
+        "stages": stages
+    }
+
+
+def task_months(tasks):
+    """
+    Every (year, month) the tasks read, in order.
+    """
+    return sorted({
+        key for task in tasks
+        for key in build_cache.period_months(task[1], build_cache.task_mode(task))
+    })
+
+
+def prepare_shared_outputs(tasks):
+    """
+    Write files that tasks would otherwise race to create: the loc_id →
+    cell cache and the sketches and checklist matrices of every month the
+    tasks read, the shared web grid for maps, the species image index and
+    thumbnails for summaries.
+    """
+    update_loc_grid()
+
+    # A month's map and summary both build these on first use
+    for year, month in task_months(tasks):
+        month_sketch(year, month)
+        month_matrix(year, month)
+
+    if any(task[0] != "map" for task in tasks):
+        load_index()
+
+    if any(task[0] == "map" for task in tasks):
+        write_web_grid()
+
+
+def render_tasks(tasks, workers=RENDER_WORKERS, force=False):
+    """
+    Run every stale task and return one result per task run, in task order:
+    {"task", "seconds", "error", "stages"} where error is a traceback or
+    None and stages are the task's instrument records.
+    """
+    tasks = [tuple(task) for task in tasks]
+
+    manifest = build_cache.load_manifest()
+
+    if not force:
+        stale = build_cache.stale_tasks(tasks, manifest)
+        if len(stale) < len(tasks):
+            print(f"✓ {len(tasks) - len(stale)} task(s) up to date, skipping")
+        tasks = stale
+
+    if not tasks:
+        return []
+
+    prepare_shared_outputs(tasks)
+
+    start = time.perf_counter()
+
+    if workers <= 1:
+        results = [_run_task(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_run_task, tasks))
+
+    elapsed = time.perf_counter() - start
+
+    for r in results:
+        instrument.merge(r["stages"])
+
+    failures = [r for r in results if r["error"]]
+
+    # Only the parent process touches the manifest
+    for r in results:
+        if not r["error"] and all(o.exists() for o in build_cache.task_outputs(r["task"])):
+            build_cache.record(r["task"], manifest)
+    build_cache.save_manifest(manifest)
+
+    for r in results:
+        status = "⚠" if r["error"] else "✓"
+        print(f"{status} {r['task'][0]} {' '.join(map(str, r['task'][1:]))}: {r['seconds']:.2f}s")
+
+    for r in failures:
+        print(f"\n⚠ {r['task']} failed:\n{r['error']}")
+
+    print(
+        f"Rendered {len(results) - len(failures)}/{len(results)} tasks "
+        f"in {elapsed:.1f}s with {max(1, workers)} worker(s)"
+    )
+
+    return results
+
+
+def check_results(results):
+    """
+    Raise if any task failed, so the script (and its workflow) fails too.
+    """
+    failed = [r["task"] for r in results if r["error"]]
+
+    if failed:
+        raise RuntimeError(f"{len(failed)}/{len(results)} render task(s) failed: {failed}")
+
+
+def month_tasks(time_period):
+    return [("map", time_period, "monthly"), ("summary", time_period)]
+
+
+if __name__ == "__main__":
+    with instrument.run("monthly_render"):
+        check_results(render_tasks(month_tasks(sys.argv[1])))
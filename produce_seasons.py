@@ -1,13 +1,7 @@
-from pathlib import Path
-from datetime import datetime
-
+import instrument
 from seasons_data import get_season, get_season_year, build_season
-from generate_map import generate_map
-from generate_summary_seasonal import generate_seasonal_summary
-
-
-MONTHS_DIR = Path("months")
-SEASONS_DIR = Path("new seasons")
+from observation_store import list_months
+from parallel_render import check_results, render_tasks
 
 
 # Required month counts per season
@@ -18,14 +12,10 @@ REQUIRED_MONTHS = {
 }
 
 
-def parse_month_file(file):
+def parse_month(year, month):
     """
-    Convert 'March_2025.csv' → (season, season_year, month_number)
+    Convert (2025, 3) → (season, season_year, month_number)
     """
-    month_str, year_str = file.stem.split("_")
-    month = datetime.strptime(month_str, "%B").month
-    year = int(year_str)
-
     season = get_season(month)
     season_year = get_season_year(year, month)
 
@@ -34,23 +24,19 @@ def parse_month_file(file):
 
 def main():
 
-    print("🔹 Scanning monthly files...")
-
-    if not MONTHS_DIR.exists():
-        print("⚠ months directory missing.")
-        return
+    print("🔹 Scanning stored months...")
 
-    month_files = list(MONTHS_DIR.glob("*.csv"))
+    stored_months = list_months()
 
-    if not month_files:
-        print("⚠ No monthly files found.")
-        return
+    if not stored_months:
+        print("⚠ No stored months found.")
+        return []
 
     # Group months by (season, season_year)
     season_groups = {}
 
-    for file in month_files:
-        season, season_year, month = parse_month_file(file)
+    for year, month in stored_months:
+        season, season_year, month = parse_month(year, month)
 
         key = (season, season_year)
 
@@ -59,6 +45,8 @@ def main():
 
         season_groups[key].append(month)
 
+    tasks = []
+
     # Determine which seasons are complete
     for (season, season_year), months in season_groups.items():
 
@@ -70,14 +58,12 @@ def main():
             season_name = f"{season}_{season_year}"
             print(f"✓ Full season detected: {season_name}")
 
-            # Build CSV (safe: skips if exists)
+            # Seasons read straight from the month partitions
             build_season(season, season_year)
 
-            # Generate map
-            generate_map(season_name, mode="seasonal")
-
-            # Generate summary
-            generate_seasonal_summary(season_name)
+            # Queue map + summary; every season renders in parallel below
+            tasks.append(("map", season_name, "seasonal"))
+            tasks.append(("seasonal_summary", season_name))
 
         else:
             print(
@@ -85,8 +71,13 @@ def main():
                 f"({len(unique_months)}/{required_count} months present)"
             )
 
+    results = render_tasks(tasks)
+
     print("Seasonal pipeline complete.")
 
+    return results
+
 
 if __name__ == "__main__":
-    main()
+    with instrument.run("produce_seasons"):
+        check_results(main())
@@ -0,0 +1,275 @@
+"""
+Local aggregate query service
+Serves the count cube (see count_cube) as small JSON answers, so a map
+page fetches only the selection it shows instead of a pre-rendered page
+per period:
+
+    python query_service.py            # http://127.0.0.1:8000/ (QUERY_PORT)
+
+    /                                   explorer page (any month range, any species)
+    /api/meta                           months and species in the cube
+    /api/cells?start=2024-10&end=2025-02[&species=Black Kite]
+                                        per-cell totals, as in months/*.json
+    /api/summary?start=2024-10&end=2025-02
+                                        totals, richness and top species
+    /grid_web.geojson, /assets/...      the shared grid and species images
+
+The cube is loaded once at startup and answers are computed once per
+query and kept. Every response carries an ETag tied to the cube's
+contents and a Cache-Control lifetime, and is gzipped when the client
+accepts it. Runs entirely against the local store.
+"""
+
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import sys
+import threading
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, unquote, urlparse
+
+from count_cube import build_cube, cube_dir, load_cube, month_label
+from generate_map import WEB_GRID_FILE, write_web_grid
+from hexbin import GRID_FILE
+from observation_store import REGION_CODE
+from rendering import render
+from species_assets import ASSETS_DIR, species_image
+
+
+QUERY_PORT = int(os.getenv("QUERY_PORT", "8000"))
+
+# Answers only change when the cube is rebuilt, which changes the ETag
+API_MAX_AGE = 3600
+STATIC_MAX_AGE = 86400
+
+GZIP_MIN_BYTES = 1024
+QUERY_CACHE_SIZE = 1024
+
+
+# ---------------------------------------
+# QUERIES
+# ---------------------------------------
+
+class QueryError(ValueError):
+    pass
+
+
+def _range(params, cube):
+    start = params.get("start") or month_label(*cube.months[0])
+    end = params.get("end") or month_label(*cube.months[-1])
+
+    try:
+        cube.month_slice(start, end)
+    except ValueError:
+        raise QueryError("start and end must be YYYY-MM")
+
+    return start, end
+
+
+def meta(cube, params):
+    names = cube.species["commonName"].dropna().unique().tolist()
+
+    return {
+        "months": [month_label(*key) for key in cube.months],
+        "species": sorted(names)
+    }
+
+
+def cells(cube, params):
+    start, end = _range(params, cube)
+    species = params.get("species")
+
+    if species:
+        frame = cube.species_cells(species, start, end)
+        data = {
+            str(row.grid_id): {"observations": int(row.observations), "checklists": int(row.checklists)}
+            for row in frame.itertuples(index=False)
+        }
+    else:
+        frame = cube.cells(start, end)
+        data = {
+            str(row.grid_id): {
+                "observations": int(row.observations),
+                "checklists": int(row.checklists),
+                "top_species": row.top_species
+            }
+            for row in frame.itertuples(index=False)
+        }
+
+    return {"period": f"{start}..{end}", "species": species, "cells": data}
+
+
+def summary(cube, params):
+    start, end = _range(params, cube)
+    total_observations, species_richness, top = cube.summary(start, end)
+
+    def image(name):
+        entry = species_image(name)
+        return f"/assets/{quote(entry['thumb'])}" if entry else None
+
+    return {
+        "period": f"{start}..{end}",
+        "total_observations": total_observations,
+        "species_richness": species_richness,
+        "top_species": [
+            {"name": name, "count": int(count), "image": image(name)}
+            for name, count in zip(top["Name"], top["Count"])
+        ]
+    }
+
+
+QUERIES = {
+    "/api/meta": meta,
+    "/api/cells": cells,
+    "/api/summary": summary
+}
+
+
+# ---------------------------------------
+# SERVICE
+# ---------------------------------------
+
+def cube_version(region=REGION_CODE, grid_file=GRID_FILE):
+    """
+    Changes whenever the cube is rebuilt from different data.
+    """
+    data = (cube_dir(region, grid_file) / "vocab.json").read_bytes()
+    return hashlib.sha1(data).hexdigest()[:12]
+
+
+def explorer_page():
+    return render("explore.html", grid_url=WEB_GRID_FILE.as_posix())
+
+
+def make_handler(cube, version):
+
+    @lru_cache(maxsize=QUERY_CACHE_SIZE)
+    def answer(path, query):
+        params = {key: values[-1] for key, values in parse_qs(query).items()}
+        body = json.dumps(QUERIES[path](cube, params), separators=(",", ":")).encode("utf-8")
+        return body, f'"{version}-{hashlib.sha1(body).hexdigest()[:16]}"'
+
+    # The cube's arrays are shared; numpy reads on them are thread-safe,
+    # but answer()'s cache is filled under a lock
+    lock = threading.Lock()
+
+    static_files = {
+        f"/{WEB_GRID_FILE.as_posix()}": WEB_GRID_FILE
+    }
+
+    class Handler(BaseHTTPRequestHandler):
+
+        def do_GET(self):
+            url = urlparse(self.path)
+
+            if url.path in QUERIES:
+                try:
+                    with lock:
+                        body, etag = answer(url.path, url.query)
+                except QueryError as e:
+                    self.send_error(400, str(e))
+                    return
+
+                self.respond(body, "application/json", etag, API_MAX_AGE)
+
+            elif url.path in ("/", "/index.html"):
+                body = explorer_page().encode("utf-8")
+                self.respond(body, "text/html; charset=utf-8", f'"{hashlib.sha1(body).hexdigest()[:16]}"', 0)
+
+            else:
+                path = self.static_path(url.path)
+
+                if path is None:
+                    self.send_error(404)
+                    return
+
+                body = path.read_bytes()
+                content_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+                if path.suffix == ".geojson":
+                    content_type = "application/geo+json"
+
+                self.respond(body, content_type, f'"{hashlib.sha1(body).hexdigest()[:16]}"', STATIC_MAX_AGE)
+
+        def static_path(self, url_path):
+            if url_path in static_files:
+                return static_files[url_path]
+
+            if url_path.startswith("/assets/"):
+                assets = ASSETS_DIR.resolve()
+                path = (assets / unquote(url_path[len("/assets/"):])).resolve()
+
+                # Nothing outside assets/ is ever served
+                if path.is_file() and assets in path.parents:
+                    return path
+
+            return None
+
+        def respond(self, body, content_type, etag, max_age):
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+
+            gzipped = (
+                len(body) >= GZIP_MIN_BYTES
+                and "gzip" in self.headers.get("Accept-Encoding", "")
+                and not content_type.startswith("image/")
+            )
+            if gzipped:
+                body = gzip.compress(body, mtime=0)
+
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", f"public, max-age={max_age}" if max_age else "no-cache")
+            self.send_header("Vary", "Accept-Encoding")
+            if gzipped:
+                self.send_header("Content-Encoding", "gzip")
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def start_server(port=QUERY_PORT, region=REGION_CODE, grid_file=GRID_FILE):
+    """
+    Load the cube (building it if needed) and serve it on a background
+    thread. Returns (server, base_url); call server.shutdown() when done.
+    """
+    cube = load_cube(region, grid_file) or build_cube(region, grid_file)
+
+    if cube is None:
+        raise RuntimeError("No stored months to serve")
+
+    if not WEB_GRID_FILE.exists():
+        write_web_grid(grid_file)
+
+    server = ThreadingHTTPServer(
+        ("127.0.0.1", port),
+        make_handler(cube, cube_version(region, grid_file))
+    )
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    return server, base_url
+
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else QUERY_PORT
+
+    server, base_url = start_server(port)
+    print(f"✓ Serving the count cube at {base_url}/ (Ctrl+C to stop)")
+
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,88 @@
+"""
+Shared page rendering
+Every generated page comes from a template in templates/:
+
+    map.html       the Leaflet map page (monthly and seasonal)
+    summary.html   the monthly / seasonal summary page
+    species.html   one species block on a summary page
+
+Templates are string.Template files ($name placeholders, so CSS and JS
+braces need no escaping). Each is read and compiled once per process and
+reused for every period rendered. Pages are written in one buffered write,
+and a file whose content hasn't changed is left untouched.
+"""
+
+import os
+from functools import lru_cache
+from pathlib import Path
+from string import Template
+
+import instrument
+
+
+TEMPLATES_DIR = Path(__file__).resolve().parent / "templates"
+
+
+@lru_cache(maxsize=None)
+def load_template(template):
+    text = (TEMPLATES_DIR / template).read_text(encoding="utf-8")
+
+    # The file's final newline belongs to the file, not the rendered text
+    return Template(text[:-1] if text.endswith("\n") else text)
+
+
+def render(template, **values):
+    return load_template(template).substitute(values)
+
+
+def write_page(path, text):
+    """
+    Write `text` to `path` atomically. Returns False (and leaves the file
+    alone) if it already holds exactly that text.
+    """
+    path = Path(path)
+    data = text.encode("utf-8")
+
+    if path.exists() and path.stat().st_size == len(data) and path.read_bytes() == data:
+        return False
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(data)
+    tmp.replace(path)
+
+    instrument.count(bytes_written=len(data))
+
+    return True
+
+
+# ---------------------------------------
+# PAGES
+# ---------------------------------------
+
+def map_page(time_period, grid_url, data_url):
+    return render("map.html", time_period=time_period, grid_url=grid_url, data_url=data_url)
+
+
+def summary_page(title, richness_label, total_observations, species_richness, checklists,
+                 species_blocks):
+    """
+    `species_blocks` is [(name, reporting frequency, image html), ...] in
+    display order.
+    """
+    top_species = "".join(
+        render("species.html", name=name, frequency=f"{frequency:.1%}", image=image)
+        for name, frequency, image in species_blocks
+    )
+
+    return render(
+        "summary.html",
+        title=title,
+        richness_label=richness_label,
+        total_observations=total_observations,
+        species_richness=species_richness,
+        checklists=checklists,
+        top_species=top_species
+    )
@@ -0,0 +1,260 @@
+"""
+Canonical observation schema
+One definition of every observation column's type, used by everything that
+reads or writes observations (the store, fetched days, legacy CSVs):
+
+    speciesCode, commonName, scientificName,
+    locId, locName, exoticCategory        categorical (dictionary-encoded)
+    latitude, longitude                   float32
+    observationCount                      nullable Int32 ('X' → <NA>)
+    observationDate                       datetime64[s]
+    obsValid, obsReviewed, locationPrivate  nullable boolean
+    subId                                 string
+
+Stored months hold species_id and loc_id (int32) instead of the species and
+location columns, which live once each in the vocabulary (see vocab).
+Staged days keep every column as fetched (FETCHED_SCHEMA) and are encoded
+when they are merged into their month.
+
+Run this file for a memory report on the stored months against the plain
+object/float64 columns pd.read_csv would give.
+"""
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+
+# ---------------------------------------
+# SCHEMA
+# ---------------------------------------
+
+# Repeated strings become dictionary-encoded categoricals; coordinates
+# don't need float64 precision for ~18 km hexes.
+CATEGORICAL_COLUMNS = [
+    "speciesCode", "commonName", "scientificName",
+    "locId", "locName", "exoticCategory"
+]
+FLOAT32_COLUMNS = ["latitude", "longitude"]
+COUNT_COLUMNS = ["observationCount"]
+DATE_COLUMNS = ["observationDate"]
+BOOL_COLUMNS = ["obsValid", "obsReviewed", "locationPrivate"]
+
+_DICT = pa.dictionary(pa.int32(), pa.string())
+
+# Indexes into the species and location tables (see vocab)
+ID_COLUMNS = ["species_id", "loc_id"]
+
+# Every month file has exactly this schema, so chunks can be appended to
+# one Parquet file whatever columns a given day's response happened to
+# include.
+OBSERVATION_SCHEMA = pa.schema([
+    ("species_id", pa.int32()),
+    ("loc_id", pa.int32()),
+    ("observationDate", pa.timestamp("s")),
+    ("observationCount", pa.int32()),
+    ("obsValid", pa.bool_()),
+    ("obsReviewed", pa.bool_()),
+    ("locationPrivate", pa.bool_()),
+    ("subId", pa.string()),
+    ("exoticCategory", _DICT)
+])
+
+# Staged days: rows as fetched, species and locations spelled out
+FETCHED_SCHEMA = pa.schema([
+    ("speciesCode", _DICT),
+    ("commonName", _DICT),
+    ("scientificName", _DICT),
+    ("locId", _DICT),
+    ("locName", _DICT),
+    ("observationDate", pa.timestamp("s")),
+    ("observationCount", pa.int32()),
+    ("latitude", pa.float32()),
+    ("longitude", pa.float32()),
+    ("obsValid", pa.bool_()),
+    ("obsReviewed", pa.bool_()),
+    ("locationPrivate", pa.bool_()),
+    ("subId", pa.string()),
+    ("exoticCategory", _DICT)
+])
+
+_FIELD_TYPES = {field.name: field.type for schema in (FETCHED_SCHEMA, OBSERVATION_SCHEMA) for field in schema}
+
+# Arrow → pandas for the types whose defaults would lose nulls or widen
+_PANDAS_TYPES = {
+    pa.int32(): pd.Int32Dtype(),
+    pa.bool_(): pd.BooleanDtype()
+}
+
+
+# ---------------------------------------
+# PANDAS
+# ---------------------------------------
+
+def _to_bool(values):
+    if pd.api.types.is_bool_dtype(values):
+        return values.astype("boolean")
+
+    # CSVs and hand-edited files spell them as text
+    lookup = {"true": True, "false": False}
+    return values.map(
+        lambda v: v if isinstance(v, bool) else lookup.get(str(v).lower())
+    ).astype("boolean")
+
+
+def apply_dtypes(df):
+    """
+    `df` with every schema column it has converted to its canonical dtype.
+    """
+    df = df.copy()
+
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+
+    for col in FLOAT32_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype("float32")
+
+    for col in COUNT_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype("Int32")
+
+    for col in DATE_COLUMNS:
+        if col in df.columns and not pd.api.types.is_datetime64_any_dtype(df[col]):
+            df[col] = pd.to_datetime(df[col], format="ISO8601").astype("datetime64[s]")
+
+    for col in BOOL_COLUMNS:
+        if col in df.columns:
+            df[col] = _to_bool(df[col])
+
+    return df
+
+
+def plain(df):
+    """
+    `df` the way a default pd.read_csv would hold it, for comparison.
+    """
+    df = df.copy()
+
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype) or df[col].dtype == "boolean":
+            df[col] = df[col].astype(object)
+        elif pd.api.types.is_datetime64_any_dtype(df[col]):
+            df[col] = df[col].dt.strftime("%Y-%m-%d %H:%M").astype(object)
+        elif pd.api.types.is_numeric_dtype(df[col]):
+            df[col] = df[col].astype("float64")
+        else:
+            df[col] = df[col].astype(object)
+
+    return df
+
+
+# ---------------------------------------
+# ARROW
+# ---------------------------------------
+
+def to_arrow(df, schema=OBSERVATION_SCHEMA):
+    """
+    `df` as an Arrow table with `schema`: missing columns become nulls and
+    unknown ones are dropped.
+    """
+    df = df.reindex(columns=schema.names)
+
+    # Strings go in as plain strings and are dictionary-encoded by the cast,
+    # which also fixes up all-null columns a response didn't include
+    for field in schema:
+        if pa.types.is_dictionary(field.type) or pa.types.is_string(field.type):
+            df[field.name] = df[field.name].astype(pd.StringDtype())
+
+    dictionary_columns = [col for col in CATEGORICAL_COLUMNS if col in df.columns]
+    df = apply_dtypes(df.drop(columns=dictionary_columns)).join(df[dictionary_columns])
+    df = df[schema.names]
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    return table.replace_schema_metadata(None).cast(schema)
+
+
+def conform(table):
+    """
+    Cast a table's schema columns to their canonical types, so files
+    written before a schema change read the same as new ones.
+    """
+    # Old pandas metadata would turn the cast columns back into strings
+    table = table.replace_schema_metadata(None)
+
+    for i, name in enumerate(table.column_names):
+        if name in _FIELD_TYPES:
+            target = _FIELD_TYPES[name]
+            if table.schema.field(i).type != target:
+                table = table.set_column(i, name, table.column(i).cast(target))
+
+    return table
+
+
+def to_frame(table):
+    df = conform(table).to_pandas(types_mapper=_PANDAS_TYPES.get)
+
+    # Ids are never null, so they can stay plain int32 for indexing
+    for col in ID_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype("int32")
+
+    return df
+
+
+# ---------------------------------------
+# READERS
+# ---------------------------------------
+
+def read_parquet(path, columns=None):
+    return to_frame(pq.read_table(path, columns=columns))
+
+
+def iter_parquet(path, columns=None, chunk_rows=100_000):
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows, columns=columns):
+        yield to_frame(pa.Table.from_batches([batch]))
+
+
+def read_csv(path):
+    dtypes = {col: "category" for col in CATEGORICAL_COLUMNS}
+    dtypes.update({col: "float32" for col in FLOAT32_COLUMNS})
+
+    return apply_dtypes(pd.read_csv(path, dtype=dtypes))
+
+
+# ---------------------------------------
+# MEMORY REPORT
+# ---------------------------------------
+
+def memory_report(df, label="observations"):
+    """
+    Print and return per-column memory (MB) for `df` against its plain
+    object/float64 equivalent.
+    """
+    compact = df.memory_usage(deep=True, index=False)
+    baseline = plain(df).memory_usage(deep=True, index=False)
+
+    report = pd.DataFrame({
+        "dtype": df.dtypes.astype(str),
+        "plain_mb": baseline / 1e6,
+        "compact_mb": compact / 1e6
+    })
+
+    print(f"\n{label}: {len(df):,} rows")
+    print(report.round(2).to_string())
+    print(
+        f"Total: {compact.sum() / 1e6:.1f} MB "
+        f"(plain {baseline.sum() / 1e6:.1f} MB, {baseline.sum() / max(compact.sum(), 1):.1f}x smaller)"
+    )
+
+    return report
+
+
+if __name__ == "__main__":
+    from observation_store import list_months, read_months
+
+    months = list_months()
+
+    if months:
+        memory_report(read_months(months), f"{len(months)} stored months")
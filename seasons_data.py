@@ -1,11 +1,13 @@
-import pandas as pd
-from pathlib import Path
 from datetime import datetime
 
+from observation_store import REGION_CODE, has_month, iter_months_chunks, read_months
 
-MONTHS_DIR = Path("months")
-SEASONS_DIR = Path("new seasons")
-SEASONS_DIR.mkdir(exist_ok=True)
+
+SEASON_MONTHS = {
+    "Summer": [3, 4, 5],
+    "Monsoon": [6, 7, 8, 9],
+    "Winter": [10, 11, 12, 1, 2]
+}
 
 
 def get_season(month):
@@ -23,38 +25,58 @@ def get_season_year(year, month):
     return year
 
 
-def build_season(season, year):
+def season_months(season, year):
+    """
+    ('Winter', 2025) → [(2025, 10), (2025, 11), (2025, 12), (2026, 1), (2026, 2)]
+    """
+    return [
+        (year + 1 if month in [1, 2] else year, month)
+        for month in SEASON_MONTHS[season]
+    ]
 
-    season_name = f"{season}_{year}"
-    output_file = SEASONS_DIR / f"{season_name}.csv"
 
-    if output_file.exists():
-        print(f"✓ {season_name} already exists. Skipping.")
-        return
+def parse_season(season_name):
+    """
+    'Winter_2025' (or legacy 'Winter 2025') → ('Winter', 2025)
+    """
+    season, year_str = season_name.replace(" ", "_").split("_")
+    return season, int(year_str)
 
-    monthly_files = list(MONTHS_DIR.glob("*.csv"))
 
-    dfs = []
+def read_season(season, year, region=REGION_CODE, columns=None):
+    """
+    A season is a view over its month partitions; nothing is copied.
+    """
+    return read_months(season_months(season, year), region, columns)
 
-    for file in monthly_files:
-        name = file.stem  # e.g. February_2026
-        month_str, year_str = name.split("_")
-        month = datetime.strptime(month_str, "%B").month
-        year_file = int(year_str)
 
-        if get_season(month) == season and \
-           get_season_year(year_file, month) == year:
+def iter_season_chunks(season, year, region=REGION_CODE, columns=None):
+    """
+    The season's rows as a stream of DataFrames, month by month, for
+    consumers that don't need the whole season at once.
+    """
+    return iter_months_chunks(season_months(season, year), region, columns)
 
-            dfs.append(pd.read_csv(file))
 
-    if not dfs:
-        print(f"No data for {season_name}")
-        return
+def build_season(season, year, region=REGION_CODE):
+    """
+    Report which months of a season are stored. Seasons are read straight
+    from the month partitions, so there is no seasonal file to write.
+    Returns the stored (year, month) list.
+    """
+    season_name = f"{season}_{year}"
 
-    combined = pd.concat(dfs, ignore_index=True)
-    combined.to_csv(output_file, index=False)
+    stored = [
+        (y, m) for y, m in season_months(season, year)
+        if has_month(y, m, region)
+    ]
+
+    if not stored:
+        print(f"No data for {season_name}")
+    else:
+        print(f"✓ {season_name}: {len(stored)}/{len(SEASON_MONTHS[season])} months stored")
 
-    print(f"✓ Created seasonal file: {season_name}")
+    return stored
 
 
 if __name__ == "__main__":
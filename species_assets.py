@@ -0,0 +1,196 @@
+"""
+Species image index
+assets/ holds one photo per species, named after its common name. Instead of
+probing the filesystem for every species on every page, the folder is
+indexed once into assets/index.json:
+
+    {"Black Kite": {"file": "Black Kite.jpg", "width": 2048, "height": 1365,
+                    "thumb": "thumbs/Black Kite.jpg", "thumb_width": 400, ...}}
+
+Each photo also gets a small JPEG in assets/thumbs/, which is what the
+summary pages show (the full photo is a click away). The index is rebuilt,
+and only new or changed thumbnails regenerated, whenever the photos change.
+"""
+
+import json
+from functools import lru_cache
+from html import escape
+from pathlib import Path
+from urllib.parse import quote
+
+from PIL import Image, ImageOps
+
+
+ASSETS_DIR = Path("assets")
+THUMBS_DIR = "thumbs"
+INDEX_FILE = "index.json"
+
+# Earlier extensions win when a species has more than one photo
+IMAGE_EXTENSIONS = ["jpg", "png", "jpeg"]
+
+# Pages show images at up to 200px wide; 2x keeps them sharp on hi-dpi screens
+THUMB_SIZE = (400, 400)
+THUMB_QUALITY = 80
+
+
+# ---------------------------------------
+# SCANNING
+# ---------------------------------------
+
+def species_photos(assets_dir=ASSETS_DIR):
+    """
+    {species: photo path}, one photo per species.
+    """
+    photos = {}
+
+    for ext in IMAGE_EXTENSIONS:
+        for path in sorted(Path(assets_dir).glob(f"*.{ext}")):
+            photos.setdefault(path.stem, path)
+
+    return photos
+
+
+def photo_signature(photos):
+    """
+    What the index was built from: each photo's file name and size.
+    """
+    return sorted([path.name, path.stat().st_size] for path in photos.values())
+
+
+# ---------------------------------------
+# THUMBNAILS
+# ---------------------------------------
+
+def make_thumbnail(source, target):
+    with Image.open(source) as img:
+        width, height = img.size
+
+        thumb = ImageOps.exif_transpose(img).convert("RGB")
+        thumb.thumbnail(THUMB_SIZE, Image.LANCZOS)
+
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_name(f"{target.name}.tmp")
+        thumb.save(tmp, "JPEG", quality=THUMB_QUALITY, optimize=True, progressive=True)
+        tmp.replace(target)
+
+        return (width, height), thumb.size
+
+
+# ---------------------------------------
+# INDEX
+# ---------------------------------------
+
+def build_index(assets_dir=ASSETS_DIR):
+    """
+    Index every photo, regenerating thumbnails for photos that are new or
+    changed since the last index. Writes and returns the index.
+    """
+    assets_dir = Path(assets_dir)
+    photos = species_photos(assets_dir)
+
+    previous = read_index(assets_dir) or {}
+    old_species = previous.get("species", {})
+
+    species = {}
+    made = 0
+
+    for name, path in sorted(photos.items()):
+        thumb_rel = f"{THUMBS_DIR}/{name}.jpg"
+        size = path.stat().st_size
+        old = old_species.get(name)
+
+        if (
+            old and old["file"] == path.name and old["bytes"] == size
+            and (assets_dir / thumb_rel).exists()
+        ):
+            species[name] = old
+            continue
+
+        (width, height), (thumb_width, thumb_height) = make_thumbnail(path, assets_dir / thumb_rel)
+        made += 1
+
+        species[name] = {
+            "file": path.name,
+            "width": width,
+            "height": height,
+            "bytes": size,
+            "thumb": thumb_rel,
+            "thumb_width": thumb_width,
+            "thumb_height": thumb_height,
+            "thumb_bytes": (assets_dir / thumb_rel).stat().st_size
+        }
+
+    # Thumbnails of photos that were removed
+    for thumb in (assets_dir / THUMBS_DIR).glob("*.jpg"):
+        if thumb.stem not in species:
+            thumb.unlink()
+
+    index = {"signature": photo_signature(photos), "species": species}
+
+    path = assets_dir / INDEX_FILE
+    tmp = path.with_suffix(".json.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=1, sort_keys=True)
+    tmp.replace(path)
+
+    full = sum(entry["bytes"] for entry in species.values())
+    thumbs = sum(entry["thumb_bytes"] for entry in species.values())
+    print(
+        f"✓ Indexed {len(species)} species photos ({made} thumbnails made, "
+        f"{thumbs / 1e6:.1f} MB of thumbnails for {full / 1e6:.1f} MB of photos)"
+    )
+
+    return index
+
+
+def read_index(assets_dir=ASSETS_DIR):
+    path = Path(assets_dir) / INDEX_FILE
+
+    if not path.exists():
+        return None
+
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+@lru_cache(maxsize=None)
+def load_index(assets_dir=ASSETS_DIR):
+    """
+    {species: entry}, rebuilding the index first if the photos changed.
+    """
+    index = read_index(assets_dir)
+
+    if index is None or index["signature"] != photo_signature(species_photos(assets_dir)):
+        index = build_index(assets_dir)
+
+    return index["species"]
+
+
+# ---------------------------------------
+# LOOKUP
+# ---------------------------------------
+
+def species_image(species, assets_dir=ASSETS_DIR):
+    return load_index(assets_dir).get(species)
+
+
+def image_html(species, assets_dir=ASSETS_DIR):
+    """
+    The thumbnail linked to the full photo, as used on summary pages
+    (which live one folder below the site root).
+    """
+    entry = species_image(species, assets_dir)
+
+    if entry is None:
+        return f"<p><i>img not found: {escape(species)}</i></p>"
+
+    return (
+        f'<a href="../assets/{quote(entry["file"])}">'
+        f'<img src="../assets/{quote(entry["thumb"])}" '
+        f'width="{entry["thumb_width"]}" height="{entry["thumb_height"]}" '
+        f'alt="{escape(species)}" loading="lazy"></a>'
+    )
+
+
+if __name__ == "__main__":
+    build_index()
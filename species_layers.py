@@ -0,0 +1,171 @@
+"""
+Per-species distribution layers
+Every species' count and reporting rate in every hex cell, written as one
+small file per species:
+
+    python species_layers.py               # all stored months → species/all/
+    python species_layers.py Winter_2025   # a season (or a month, e.g. January_2025)
+
+    species/<period>/index.json        species list and per-cell checklist totals
+    species/<period>/<speciesCode>.json
+        {"grid_id": [...], "observations": [...], "checklists": [...], "reporting_rate": [...]}
+
+`checklists` counts the cell's checklists that reported the species, and
+`reporting_rate` is that over all the cell's checklists. Both come from the
+months' checklist matrices (see checklist_matrix) and `observations` from
+their sketches (see month_aggregates), so a period is a merge of cached
+per-month files rather than a pass over its observations.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+
+import instrument
+from checklist_matrix import period_matrix
+from hexbin import GRID_FILE, OUTSIDE_GRID
+from month_aggregates import period_sketch
+from observation_store import REGION_CODE, has_month, list_months, parse_period, period_name
+from rendering import write_page
+from seasons_data import SEASON_MONTHS, parse_season, season_months
+from vocab import MISSING_ID
+
+
+LAYERS_DIR = Path("species")
+
+SPECIES_KEYS = ["speciesCode", "commonName", "scientificName"]
+
+
+# ---------------------------------------
+# PERIODS
+# ---------------------------------------
+
+def period_months(period=None, region=REGION_CODE):
+    """
+    'Winter_2025', 'January_2025' or None (every stored month) → the
+    stored (year, month) list.
+    """
+    if period is None:
+        return list_months(region)
+
+    if period.replace(" ", "_").split("_")[0] in SEASON_MONTHS:
+        months = season_months(*parse_season(period))
+    else:
+        months = [parse_period(period)]
+
+    return [key for key in months if has_month(*key, region)]
+
+
+# ---------------------------------------
+# COUNTING
+# ---------------------------------------
+
+def period_counts(months, region=REGION_CODE, grid_file=GRID_FILE):
+    """
+    (one row per (grid_id, species) with observations, reporting checklists
+     and reporting rate, per grid_id checklists) over `months`, or
+    (None, None) if they hold no observations.
+    """
+    sketch = period_sketch(months, region, grid_file)
+    matrix = period_matrix(months, region, grid_file)
+
+    if sketch is None or matrix is None:
+        return None, None
+
+    with instrument.stage("aggregate", f"{period_name(*months[0])}..{period_name(*months[-1])}"):
+        per_cell = matrix.checklist_counts()
+        per_cell = per_cell[per_cell.index != OUTSIDE_GRID]
+
+        observations = (
+            sketch[(sketch["grid_id"] != OUTSIDE_GRID) & (sketch["species_id"] != MISSING_ID)]
+            .rename(columns={"count": "observations"})[["grid_id", "species_id", "observations"]]
+        )
+
+        species = observations.merge(
+            matrix.reporting_frequency(), on=["grid_id", "species_id"], how="left"
+        )
+        species["reporting_rate"] = species.pop("frequency").round(4)
+
+    return species, per_cell
+
+
+# ---------------------------------------
+# LAYERS
+# ---------------------------------------
+
+def write_layers(period=None, region=REGION_CODE, grid_file=GRID_FILE, layers_dir=LAYERS_DIR):
+    """
+    Write every species' layer for `period` (see period_months). Returns
+    the index, or None if the period has no stored months.
+    """
+    months = period_months(period, region)
+    label = period or "all"
+
+    if not months:
+        print(f"⚠ No stored months for {label}.")
+        return None
+
+    species, per_cell = period_counts(months, region, grid_file)
+
+    if species is None:
+        print(f"⚠ {label} empty.")
+        return None
+
+    out_dir = Path(layers_dir) / label
+    index = []
+
+    with instrument.stage("render", label):
+        species = species.sort_values(["speciesCode", "grid_id"])
+
+        for (code, common, scientific), layer in species.groupby(SPECIES_KEYS, observed=True, sort=False):
+            data = {
+                "speciesCode": code,
+                "commonName": common,
+                "scientificName": scientific,
+                "period": label,
+                "grid_id": layer["grid_id"].tolist(),
+                "observations": layer["observations"].tolist(),
+                "checklists": layer["checklists"].tolist(),
+                "reporting_rate": layer["reporting_rate"].tolist()
+            }
+            write_page(out_dir / f"{code}.json", json.dumps(data, separators=(",", ":")))
+
+            index.append({
+                "speciesCode": code,
+                "commonName": common,
+                "scientificName": scientific,
+                "observations": int(layer["observations"].sum()),
+                "cells": len(layer)
+            })
+
+        index = {
+            "period": label,
+            "months": [f"{year}-{month:02d}" for year, month in months],
+            "cells": {
+                "grid_id": per_cell.index.astype(int).tolist(),
+                "checklists": per_cell.astype(int).tolist()
+            },
+            "species": sorted(index, key=lambda s: -s["observations"])
+        }
+        write_page(out_dir / "index.json", json.dumps(index, separators=(",", ":")))
+
+    # Species that dropped out of the period since the last run
+    written = {f"{s['speciesCode']}.json" for s in index["species"]} | {"index.json"}
+    for path in out_dir.glob("*.json"):
+        if path.name not in written:
+            path.unlink()
+
+    print(
+        f"✓ Species layers for {label}: {len(index['species'])} species over "
+        f"{len(per_cell)} cells ({int(np.sum(per_cell))} checklists)"
+    )
+
+    return index
+
+
+if __name__ == "__main__":
+    with instrument.run("species_layers"):
+        for period in sys.argv[1:] or [None]:
+            write_layers(period)
@@ -0,0 +1,20 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# The modules are top-level scripts, not a package
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import vocab  # noqa: E402
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    """
+    An empty store: the store paths are relative, so run in a fresh
+    directory with vocab's table cache cleared.
+    """
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(vocab, "_tables", {})
+    return tmp_path / "store"
@@ -0,0 +1,57 @@
+import shutil
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+import grid_index
+import vocab
+from month_aggregates import month_sketch
+from observation_store import partition_dir, write_month
+
+
+GRID = Path(__file__).resolve().parent.parent / "grid.geojson"
+
+
+@pytest.fixture
+def grid_store(store):
+    shutil.copy(GRID, "grid.geojson")
+    return store
+
+
+def observation(loc_id, latitude, longitude, sub_id):
+    return pd.DataFrame({
+        "subId": [sub_id],
+        "speciesCode": ["comior1"],
+        "commonName": ["Common Iora"],
+        "scientificName": ["Aegithina tiphia"],
+        "locId": [loc_id],
+        "locName": [loc_id],
+        "latitude": [latitude],
+        "longitude": [longitude],
+        "observationDate": [pd.Timestamp("2025-01-05")],
+        "observationCount": [1]
+    })
+
+
+def test_moved_location_clears_its_months(grid_store):
+    write_month(observation("L1", 19.0, 73.0, "S1"), 2025, 1)
+    write_month(observation("L2", 19.1, 73.1, "S2"), 2025, 2)
+
+    before = month_sketch(2025, 1)["grid_id"].tolist()
+    month_sketch(2025, 2)
+    assert grid_index.placement_revision() == 0
+
+    # eBird moves L1 into another cell
+    vocab.encode(observation("L1", 17.5, 74.5, "S3"))
+    grid_index.update_loc_grid()
+
+    assert grid_index.placement_revision() == 1
+    assert [p.name for p in partition_dir(2025, 1).iterdir()] == ["observations.parquet"]
+    assert any(p.name.startswith("aggregates_") for p in partition_dir(2025, 2).iterdir())
+
+    assert month_sketch(2025, 1)["grid_id"].tolist() != before
+
+    # Nothing moved since: the revision stays put
+    grid_index.update_loc_grid()
+    assert grid_index.placement_revision() == 1
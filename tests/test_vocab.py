@@ -0,0 +1,107 @@
+from datetime import date
+
+import pandas as pd
+
+import vocab
+from incremental_fetch import compact_month
+from observation_store import read_month, stage_day, write_month
+
+
+def observations(rows):
+    """
+    Fetched-style rows from (subId, speciesCode, commonName, locId, latitude, count).
+    """
+    df = pd.DataFrame(rows, columns=["subId", "speciesCode", "commonName", "locId", "latitude", "observationCount"])
+
+    return df.assign(
+        scientificName=df["commonName"] + " sp.",
+        locName=df["locId"] + " hotspot",
+        longitude=73.0,
+        observationDate=pd.Timestamp("2025-01-05"),
+        obsValid=True,
+        obsReviewed=False,
+        locationPrivate=False,
+        exoticCategory=None
+    )
+
+
+def test_encode_decode_round_trip(store):
+    df = observations([
+        ("S1", "comior1", "Common Iora", "L1", 19.0, 2),
+        ("S1", "houcro1", "House Crow", "L1", 19.0, 5),
+        ("S2", "comior1", "Common Iora", "L2", 18.5, 1)
+    ])
+
+    encoded = vocab.encode(df)
+
+    assert not set(vocab.VOCAB_COLUMNS) & set(encoded.columns)
+    assert encoded["species_id"].tolist() == [0, 1, 0]
+    assert encoded["loc_id"].tolist() == [0, 0, 1]
+
+    decoded = vocab.decode(encoded)
+    for col in vocab.VOCAB_COLUMNS:
+        expected = df[col].astype("float32") if col in vocab.COORD_COLUMNS else df[col]
+        assert decoded[col].tolist() == expected.tolist()
+
+    # The tables survive a reload from disk
+    vocab._tables.clear()
+    assert vocab.decode(encoded, ["commonName"])["commonName"].tolist() == df["commonName"].tolist()
+
+
+def test_changed_names_and_coordinates_update_in_place(store):
+    vocab.encode(observations([
+        ("S1", "comior1", "Common Iora", "L1", 19.0, 2),
+        ("S2", "houcro1", "House Crow", "L2", 18.5, 1)
+    ]))
+
+    encoded = vocab.encode(observations([
+        ("S3", "comior1", "Common Myna", "L1", 19.25, 4)
+    ]))
+
+    assert encoded["species_id"].tolist() == [0]
+    assert encoded["loc_id"].tolist() == [0]
+
+    species = vocab.load_table("species_id")
+    assert species["commonName"].tolist() == ["Common Myna", "House Crow"]
+
+    locations = vocab.load_table("loc_id")
+    assert locations["latitude"].tolist() == [19.25, 18.5]
+
+    # Rows that leave a name out don't blank it
+    vocab.encode(observations([("S4", "comior1", None, "L1", None, 1)]))
+    assert vocab.load_table("species_id")["commonName"].tolist() == ["Common Myna", "House Crow"]
+    assert vocab.load_table("loc_id")["latitude"].tolist() == [19.25, 18.5]
+
+
+def test_compact_month_keeps_newest_copy(store):
+    write_month(observations([
+        ("S1", "comior1", "Common Iora", "L1", 19.0, 1),
+        ("S1", "houcro1", "House Crow", "L1", 19.0, 1),
+        ("S2", "comior1", "Common Iora", "L2", 18.5, 1)
+    ]), 2025, 1)
+
+    # S1/comior1 is refetched twice; the later day's copy wins
+    stage_day(observations([
+        ("S1", "comior1", "Common Iora", "L1", 19.0, 2),
+        ("S3", "blkkit3", "Black Kite", "L2", 18.5, 1)
+    ]), date(2025, 1, 5))
+    stage_day(observations([
+        ("S1", "comior1", "Common Iora", "L1", 19.0, 3),
+        ("S3", "blkkit3", "Black Kite", "L2", 18.5, 2),
+        ("S3", "blkkit3", "Black Kite", "L2", 18.5, 4)
+    ]), date(2025, 1, 6))
+
+    rows, staged = compact_month("IN-MH", 2025, 1)
+
+    assert (rows, staged) == (4, 5)
+
+    month = read_month(2025, 1, "IN-MH")
+    counts = month.set_index(["subId", "speciesCode"])["observationCount"].to_dict()
+
+    assert counts == {
+        ("S1", "houcro1"): 1,
+        ("S2", "comior1"): 1,
+        ("S1", "comior1"): 3,
+        ("S3", "blkkit3"): 4
+    }
+    assert len(vocab.load_table("species_id")) == 3
@@ -15,18 +15,19 @@ then get to the SDM project, with this dashboard as the foundation for the prese
 
 """
 Robust bootstrap pipeline
-Fetch → verify CSV → generate monthly outputs
+Fetch → verify stored month → generate monthly outputs
 Then build seasonal → generate seasonal outputs
 """
 
 import calendar
-from pathlib import Path
-import pandas as pd
+from datetime import date
 
-from fetch_data_initial import fetch_month_data
-from generate_map import generate_map
-from generate_summary import generate_summary
-from generate_summary_seasonal import generate_seasonal_summary
+import instrument
+from backfill import backfill
+from fetch_data_initial import REGION_CODE
+from observation_store import has_month
+from parallel_render import check_results, render_tasks
+from seasons_data import build_season
 
 
 MONTHS_2025 = list(range(1, 13))
@@ -44,6 +45,19 @@ YEAR_MONTHS = {
 
 def run_monthly():
 
+    tasks = []
+
+    # 1️⃣ Fetch every month in one scheduled run (only days not already in
+    # store/manifest.json), newest first under one rate limit
+    first_year, last_year = min(YEAR_MONTHS), max(YEAR_MONTHS)
+    first_month, last_month = min(YEAR_MONTHS[first_year]), max(YEAR_MONTHS[last_year])
+
+    backfill(
+        [REGION_CODE],
+        date(first_year, first_month, 1),
+        date(last_year, last_month, calendar.monthrange(last_year, last_month)[1])
+    )
+
     for year, months in YEAR_MONTHS.items():
 
         for month in months:
@@ -53,23 +67,19 @@ def run_monthly():
 
             print(f"\nProcessing {time_period}")
 
-            # 1️⃣ Fetch CSV
-            fetch_month_data(year, month)
-
-            csv_path = Path(f"months/{time_period}.csv")
-
-            # 2️⃣ VERIFY FILE EXISTS BEFORE CONTINUING
-            if not csv_path.exists():
-                print(f"⚠ CSV not created for {time_period}. Skipping.")
+            # 2️⃣ VERIFY MONTH IS STORED BEFORE CONTINUING
+            if not has_month(year, month):
+                print(f"⚠ Month not stored for {time_period}. Skipping.")
                 continue
 
-            print(f"✓ CSV confirmed: {csv_path}")
+            print(f"✓ Month confirmed in store: {time_period}")
 
-            # 3️⃣ Generate monthly map
-            generate_map(time_period, mode="monthly")
+            # 3️⃣ Queue monthly map + summary
+            tasks.append(("map", time_period, "monthly"))
+            tasks.append(("summary", time_period))
 
-            # 4️⃣ Generate monthly summary
-            generate_summary(time_period)
+    # 4️⃣ Render every fetched month in parallel
+    return render_tasks(tasks)
 
 
 # ===============================
@@ -87,13 +97,12 @@ def season_from_month(month):
 
 def build_seasonal():
 
-    seasonal_data = {}
+    season_names = []
 
     for year, months in YEAR_MONTHS.items():
 
         for month in months:
 
-            month_name = calendar.month_name[month]
             season = season_from_month(month)
 
             # Handle Jan/Feb winter belonging to previous year
@@ -102,55 +111,39 @@ def build_seasonal():
             else:
                 season_year = year
 
-            key = f"{season} {season_year}"
-
-            csv_path = Path(f"months/{month_name}_{year}.csv")
-
-            if not csv_path.exists():
-                continue
-
-            df = pd.read_csv(csv_path)
-
-            if key not in seasonal_data:
-                seasonal_data[key] = []
-
-            seasonal_data[key].append(df)
+            key = f"{season}_{season_year}"
 
-    # Save seasonal CSVs
-    out_dir = Path("new seasons")
-    out_dir.mkdir(exist_ok=True)
+            if key not in season_names:
+                season_names.append(key)
 
-    for key, dfs in seasonal_data.items():
+    # Seasons are views over the stored months; nothing to copy
+    built = []
 
-        season_csv_path = out_dir / f"{key}.csv"
+    for key in season_names:
+        season, season_year = key.split("_")
 
-        # Skip if already exists
-        if season_csv_path.exists():
-            print(f"✓ {key} already built. Skipping.")
-            continue
+        if build_season(season, int(season_year)):
+            built.append(key)
 
-        season_df = pd.concat(dfs, ignore_index=True)
-        season_df.to_csv(season_csv_path, index=False)
-
-        print(f"✓ Season built: {key}")
+    return built
 
 
 # ===============================
 # GENERATE SEASONAL MAP + SUMMARY
 # ===============================
 
-def run_seasonal_outputs():
-
-    season_dir = Path("seasons")
+def run_seasonal_outputs(season_names):
 
-    for file in season_dir.glob("*.csv"):
+    tasks = []
 
-        season_name = file.stem  # e.g. "Monsoon 2025"
+    for season_name in season_names:
 
         print(f"Generating seasonal outputs for {season_name}")
 
-        generate_map(season_name, mode="seasonal")
-        generate_seasonal_summary(season_name)
+        tasks.append(("map", season_name, "seasonal"))
+        tasks.append(("seasonal_summary", season_name))
+
+    return render_tasks(tasks)
 
 
 # ===============================
@@ -159,8 +152,11 @@ def run_seasonal_outputs():
 
 if __name__ == "__main__":
 
-    run_monthly()
-    build_seasonal()
-    run_seasonal_outputs()
+    with instrument.run("update2025_seasonmonthly"):
+        results = run_monthly()
+        results += run_seasonal_outputs(build_seasonal())
+
+        # Seasons still render after a failed month; the run fails at the end
+        check_results(results)
 
     print("=== BOOTSTRAP COMPLETE ===")
@@ -1,27 +1,14 @@
-from pathlib import Path
-from generate_map import generate_map 
-
-MONTHS_FOLDER = Path("months")
+import instrument
+from batch_build import build_all
 
 
 def main():
-    if not MONTHS_FOLDER.exists():
-        print("⚠ 'months' folder not found.")
-        return
-
-    csv_files = sorted(MONTHS_FOLDER.glob("*.csv"))
-
-    if not csv_files:
-        print("⚠ No CSV files found in 'months' folder.")
-        return
-
-    for csv_file in csv_files:
-        time_period = csv_file.stem  # e.g. January_2025
-        print(f"Generating map for {time_period}...")
-        generate_map(time_period, mode="monthly")
+    # Grid and observations are loaded once for every month and season
+    build_all(include_seasons=True)
 
-    print("✓ All monthly maps generated.")
+    print("✓ All monthly and seasonal maps generated.")
 
 
 if __name__ == "__main__":
-    main()
+    with instrument.run("update_map_template"):
+        main()
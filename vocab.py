@@ -0,0 +1,352 @@
+"""
+Species and location vocabulary
+Observations are stored with two integers in place of seven repeated
+columns. species_id indexes the species table (one row per speciesCode)
+and loc_id the location table (one row per locId, with its name and
+coordinates):
+
+    store/species.parquet      species_id, speciesCode, commonName, scientificName
+    store/locations.parquet    loc_id, locId, locName, latitude, longitude
+
+An id is its row's position. Ids are handed out in the order things are
+first stored and never reused or renumbered, so everything keyed by them
+(sketches, checklist matrices, the count cube, the loc_id → cell cache)
+stays valid as the tables grow. When eBird renames a species or moves a
+location, its row is updated in place under the same id. Writes can be
+held back with deferred_writes, so a month's new entries cost one write
+per table.
+
+encode and decode are the store's write and read steps (see
+observation_store); generators group on the ids and only decode the few
+names they show. Run this file once to move a store written before the
+vocabulary existed onto it.
+"""
+
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from observation_store import (
+    STORE_DIR, list_months, list_regions, partition_path, write_month_chunks
+)
+from schema import ID_COLUMNS, iter_parquet
+
+
+SPECIES_COLUMNS = ["speciesCode", "commonName", "scientificName"]
+LOCATION_COLUMNS = ["locId", "locName", "latitude", "longitude"]
+
+# id column → (table file, the columns it stands for; the first is the key)
+TABLES = {
+    "species_id": ("species.parquet", SPECIES_COLUMNS),
+    "loc_id": ("locations.parquet", LOCATION_COLUMNS)
+}
+
+VOCAB_COLUMNS = SPECIES_COLUMNS + LOCATION_COLUMNS
+COORD_COLUMNS = ["latitude", "longitude"]
+
+# Rows without a species or location (none in real eBird data)
+MISSING_ID = -1
+
+# {path: ((mtime, size), table, key index)}; reloaded when the file changes
+_tables = {}
+
+# {path: (id column, table)} held in memory inside deferred_writes
+_pending = {}
+_deferring = 0
+
+
+# ---------------------------------------
+# TABLES
+# ---------------------------------------
+
+def table_path(id_column, root=STORE_DIR):
+    return Path(root) / TABLES[id_column][0]
+
+
+def _empty_table(id_column):
+    columns = TABLES[id_column][1]
+
+    return pd.DataFrame({
+        id_column: pd.Series(dtype="int32"),
+        **{
+            col: pd.Series(dtype="float32" if col in COORD_COLUMNS else "category")
+            for col in columns
+        }
+    })
+
+
+def load_table(id_column, root=STORE_DIR):
+    """
+    The species or location table: the id column plus categoricals for
+    names and float32 coordinates, one row per id in id order.
+    """
+    return _load(id_column, root)[0]
+
+
+def _load(id_column, root):
+    path = table_path(id_column, root)
+
+    if path in _pending:
+        return _pending[path][1], _pending[path][2]
+
+    if not path.exists():
+        return _empty_table(id_column), pd.Index([], dtype=object)
+
+    stamp = _stamp(path)
+    cached = _tables.get(path)
+
+    if cached is None or cached[0] != stamp:
+        cached = _cache(id_column, path, pd.read_parquet(path))
+
+    return cached[1], cached[2]
+
+
+def _stamp(path):
+    stat = path.stat()
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _indexed(id_column, table):
+    columns = TABLES[id_column][1]
+
+    table = table.astype({
+        col: "float32" if col in COORD_COLUMNS else "category" for col in columns
+    })
+
+    return table, pd.Index(table[columns[0]].astype(str))
+
+
+def _cache(id_column, path, table):
+    cached = (_stamp(path), *_indexed(id_column, table))
+    _tables[path] = cached
+
+    return cached
+
+
+def _save(id_column, table, root):
+    path = table_path(id_column, root)
+
+    if _deferring:
+        _pending[path] = (id_column, *_indexed(id_column, table))
+        return _pending[path][1:]
+
+    return _write(id_column, path, table)
+
+
+def _write(id_column, path, table):
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    # Plain strings on disk; categories are rebuilt on load
+    tmp = path.with_suffix(".parquet.tmp")
+    table = table.astype({
+        col: "float32" if col in COORD_COLUMNS else object for col in TABLES[id_column][1]
+    })
+    table.to_parquet(tmp, index=False)
+    tmp.replace(path)
+
+    # Cached straight away: a quick second write can share the first's mtime
+    return _cache(id_column, path, table)[1:]
+
+
+@contextmanager
+def deferred_writes():
+    """
+    Hold table additions in memory until the outermost block ends, then
+    write each changed table once. Ids handed out inside are final.
+    """
+    global _deferring
+
+    _deferring += 1
+    try:
+        yield
+    finally:
+        _deferring -= 1
+
+        if not _deferring:
+            while _pending:
+                path, (id_column, table, _) = _pending.popitem()
+                _write(id_column, path, table)
+
+
+# ---------------------------------------
+# ENCODE / DECODE
+# ---------------------------------------
+
+def _intern(id_column, rows, root):
+    """
+    Ids for `rows` (a frame of the table's columns). Unseen keys are added
+    to the table in the order they first appear; a key seen before whose
+    names or coordinates have changed is updated in place, keeping its id.
+    The last row of each key holds the values that win.
+    """
+    columns = TABLES[id_column][1]
+    keys = rows[columns[0]].astype("category")
+    categories = keys.cat.categories.astype(str)
+    codes = keys.cat.codes.to_numpy()
+
+    table, index = _load(id_column, root)
+    positions = index.get_indexer(categories)
+
+    # Each key's first row orders new ids; its last row gives its values
+    present, first = np.unique(codes, return_index=True)
+    _, last = np.unique(codes[::-1], return_index=True)
+    in_use = present >= 0
+    present, first, last = present[in_use], first[in_use], len(codes) - 1 - last[in_use]
+
+    latest = rows.iloc[last][columns].reset_index(drop=True)
+    ids = positions[present]
+
+    updated = _update_changed(id_column, table, latest[ids >= 0], ids[ids >= 0], root)
+    new = latest[ids < 0].assign(first=first[ids < 0]).sort_values("first")
+
+    if updated is not table or len(new):
+        new = new[columns].assign(**{
+            id_column: np.arange(len(updated), len(updated) + len(new), dtype=np.int32)
+        })
+
+        table, index = _save(id_column, pd.concat([updated, new[[id_column] + columns]], ignore_index=True), root)
+        positions = index.get_indexer(categories)
+
+    return np.append(positions, MISSING_ID)[codes].astype(np.int32)
+
+
+def _update_changed(id_column, table, latest, ids, root):
+    """
+    `table` with the rows `ids` set to `latest` wherever it differs (and
+    isn't missing), or `table` itself if nothing changed.
+    """
+    columns = TABLES[id_column][1]
+    changes = {}
+
+    for col in columns[1:]:
+        current = table[col].iloc[ids]
+
+        if col in COORD_COLUMNS:
+            incoming = latest[col].to_numpy(dtype=np.float32)
+            differs = ~np.isnan(incoming) & (incoming != current.to_numpy())
+        else:
+            incoming = latest[col].astype(object).to_numpy()
+            differs = latest[col].notna().to_numpy() & (
+                latest[col].astype(str).to_numpy() != current.astype(str).to_numpy()
+            )
+
+        if differs.any():
+            changes[col] = (ids[differs], incoming[differs])
+
+    if not changes:
+        return table
+
+    table = table.copy()
+    for col, (rows, values) in changes.items():
+        column = table[col].to_numpy(dtype=np.float32 if col in COORD_COLUMNS else object, copy=True)
+        column[rows] = values
+        table[col] = column
+
+    changed = np.unique(np.concatenate([rows for rows, _ in changes.values()]))
+    shown = ", ".join(table[columns[0]].iloc[changed[:5]].astype(str))
+    print(
+        f"⚠ Updated {'/'.join(changes)} of {len(changed)} {table_path(id_column, root).name} "
+        f"row(s) that changed: {shown}{', …' if len(changed) > 5 else ''}"
+    )
+
+    return table
+
+
+def encode(df, root=STORE_DIR):
+    """
+    `df` with its vocabulary columns replaced by species_id and loc_id.
+    Species and locations not seen before are added to the tables; rows
+    that already carry an id keep it.
+    """
+    df = df.copy()
+
+    for id_column, (_, columns) in TABLES.items():
+        if id_column in df.columns:
+            df[id_column] = df[id_column].astype("int32")
+        elif len(df):
+            df[id_column] = _intern(id_column, df.reindex(columns=columns), root)
+        else:
+            df[id_column] = pd.Series(dtype="int32")
+
+    return df.drop(columns=VOCAB_COLUMNS, errors="ignore")
+
+
+def _take(values, ids):
+    # An id of MISSING_ID (-1) picks the appended missing value
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        codes = np.append(values.cat.codes.to_numpy(), -1)[ids]
+        return pd.Categorical.from_codes(codes, values.cat.categories)
+
+    return np.append(values.to_numpy(), np.nan)[ids].astype(values.dtype)
+
+
+def decode(df, columns=None, root=STORE_DIR):
+    """
+    `df` with the vocabulary `columns` (all of them by default) looked up
+    from its species_id / loc_id.
+    """
+    df = df.copy()
+
+    for id_column, (_, table_columns) in TABLES.items():
+        wanted = [col for col in table_columns if columns is None or col in columns]
+
+        if not wanted or id_column not in df.columns:
+            continue
+
+        table = load_table(id_column, root)
+        ids = df[id_column].to_numpy(dtype=np.int64)
+
+        if len(ids) and ids.max() >= len(table):
+            raise KeyError(f"{id_column} {ids.max()} is not in {table_path(id_column, root)}")
+
+        for col in wanted:
+            df[col] = _take(table[col], ids)
+
+    return df
+
+
+def species_names(species_ids, columns=SPECIES_COLUMNS, root=STORE_DIR):
+    """
+    The species table's `columns` for each of `species_ids`, in order.
+    """
+    frame = pd.DataFrame({"species_id": np.asarray(species_ids, dtype=np.int32)})
+    return decode(frame, columns, root)
+
+
+# ---------------------------------------
+# MIGRATION
+# ---------------------------------------
+
+def is_encoded(path):
+    return all(col in pq.read_schema(path).names for col in ID_COLUMNS)
+
+
+def migrate_store(root=STORE_DIR):
+    """
+    Rewrite every partition still holding vocabulary strings, oldest
+    month first so ids follow the order of the data. Returns the number
+    of files rewritten.
+    """
+    rewritten = 0
+
+    for region in list_regions(root):
+        for year, month in list_months(region, root):
+            path = partition_path(year, month, region, root)
+
+            if not is_encoded(path):
+                rows = write_month_chunks(iter_parquet(path), year, month, region, root)
+                print(f"✓ {path}: {rows} rows")
+                rewritten += 1
+
+    return rewritten
+
+
+if __name__ == "__main__":
+    rewritten = migrate_store()
+
+    species = load_table("species_id")
+    locations = load_table("loc_id")
+    print(f"✓ {rewritten} file(s) migrated; {len(species)} species, {len(locations)} locations")